@@ -0,0 +1,144 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+
+def run_postgres_ddl(using, statements):
+    """
+    Run idempotent DDL that only PostgreSQL understands (GIN indexes,
+    extensions, operator classes). Other backends are left untouched so
+    local SQLite setups keep working.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+# Read replica routing. Reads only go to the replica inside views marked with
+# @read_from_replica, and not for a session pinned to the primary by
+# ReplicaPinMiddleware after a POST, so people always see their own RSVPs and edits.
+
+PINNED_UNTIL_KEY = '_db_pinned_until'
+# Sessions are always read from the primary: a lagging replica would log people out right after they sign in.
+PRIMARY_ONLY_APPS = {'sessions'}
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_alias():
+    return getattr(settings, 'REPLICA_DATABASE', None)
+
+
+@contextmanager
+def replica_reads():
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary inside a @read_from_replica view, e.g. to fill a shared cache."""
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def reading_from_replica():
+    return bool(replica_alias()) and _replica_reads.get()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = replica_alias()
+        if alias and _replica_reads.get() and model._meta.app_label not in PRIMARY_ONLY_APPS:
+            return alias
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        aliases = {'default', replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+def pin_to_primary(session):
+    session[PINNED_UNTIL_KEY] = time.time() + settings.REPLICA_STICKY_SECONDS
+
+
+def pin_after_write(request):
+    """
+    Pin the session for a write made by a GET (RSVP and remove-participant
+    links), which ReplicaPinMiddleware does not see as a write.
+    """
+    if replica_alias():
+        pin_to_primary(request.session)
+
+
+async def apin_after_write(request):
+    """pin_after_write() for async views."""
+    if replica_alias():
+        await request.session.aset(PINNED_UNTIL_KEY, time.time() + settings.REPLICA_STICKY_SECONDS)
+
+
+def is_pinned(session):
+    return session.get(PINNED_UNTIL_KEY, 0) > time.time()
+
+
+def _stream_from_replica(content):
+    """Streaming responses run their queries after the view has returned."""
+    content = iter(content)
+    while True:
+        with replica_reads():
+            chunk = next(content, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def read_from_replica(view_func):
+    """
+    Send the view's reads to the replica, unless the session is pinned to
+    the primary after a recent write. The session and user are loaded from
+    the primary first.
+    """
+    if iscoroutinefunction(view_func):
+        async def _view(request, *args, **kwargs):
+            if not replica_alias():
+                return await view_func(request, *args, **kwargs)
+            await request.auser()
+            session = getattr(request, 'session', None)
+            if session is not None and await session.aget(PINNED_UNTIL_KEY, 0) > time.time():
+                return await view_func(request, *args, **kwargs)
+            with replica_reads():
+                return await view_func(request, *args, **kwargs)
+    else:
+        def _view(request, *args, **kwargs):
+            if not replica_alias():
+                return view_func(request, *args, **kwargs)
+            request.user.is_authenticated  # loads the user now, from the primary
+            session = getattr(request, 'session', None)
+            if session is not None and is_pinned(session):
+                return view_func(request, *args, **kwargs)
+            with replica_reads():
+                response = view_func(request, *args, **kwargs)
+                if hasattr(response, 'render') and not response.is_rendered:
+                    # Template responses (class-based views) evaluate their querysets here.
+                    response.render()
+            if response.streaming:
+                response.streaming_content = _stream_from_replica(response.streaming_content)
+            return response
+
+    return wraps(view_func)(_view)
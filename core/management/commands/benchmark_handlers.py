@@ -0,0 +1,194 @@
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db.backends.signals import connection_created
+from django.test import Client
+from events.models import Event
+
+
+HOST = 'testserver'
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare WSGI (sync views, one thread per request) with ASGI (events.async_views) "
+        "throughput at a given concurrency. Requests go straight into Django's handlers, so no "
+        "server is needed; --db-latency adds a delay to every query to model a remote database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', choices=('both', 'wsgi', 'asgi'), default='both')
+        parser.add_argument('--path', action='append', dest='paths', help="URL to request (repeatable).")
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=100)
+        parser.add_argument('--user', help="Send requests as this user (skips the anonymous page cache).")
+        parser.add_argument('--db-latency', type=float, default=0.0, help="Milliseconds added to every query.")
+        parser.add_argument('--json', action='store_true', help="Print the result as JSON.")
+
+    def handle(self, *args, **options):
+        if options['server'] == 'both':
+            return self.compare(options)
+
+        paths = options['paths'] or self.default_paths()
+        cookie = self.session_cookie(options['user']) if options['user'] else ''
+        if options['db_latency']:
+            self.add_db_latency(options['db_latency'] / 1000)
+
+        run = self.run_wsgi if options['server'] == 'wsgi' else self.run_asgi
+        run(paths[:1] * 5, cookie, 5)  # warm up URLconf, templates and connections
+        result = run(self.workload(paths, options['requests']), cookie, options['concurrency'])
+        result.update(server=options['server'], async_views=settings.ASYNC_EVENT_VIEWS, paths=paths)
+
+        if options['json']:
+            self.stdout.write(json.dumps(result))
+        else:
+            self.print_results([result])
+
+    def compare(self, options):
+        """Run each server type in a fresh process with the matching ASYNC_EVENT_VIEWS."""
+        results = []
+        for server, async_views in (('wsgi', '0'), ('asgi', '1')):
+            command = [sys.executable, sys.argv[0], 'benchmark_handlers', '--server', server, '--json',
+                       '--requests', str(options['requests']), '--concurrency', str(options['concurrency']),
+                       '--db-latency', str(options['db_latency'])]
+            for path in options['paths'] or ():
+                command += ['--path', path]
+            if options['user']:
+                command += ['--user', options['user']]
+            output = subprocess.run(
+                command, env={**os.environ, 'ASYNC_EVENT_VIEWS': async_views},
+                capture_output=True, text=True,
+            )
+            if output.returncode:
+                raise CommandError(f"{server} run failed:\n{output.stderr}")
+            results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+        self.print_results(results)
+
+    def default_paths(self):
+        event_id = Event.objects.order_by('date', 'id').values_list('id', flat=True).first()
+        if event_id is None:
+            raise CommandError("No events to request; run seed_data first or pass --path.")
+        return ['/', f'/events/{event_id}/']
+
+    def workload(self, paths, count):
+        return [paths[i % len(paths)] for i in range(count)]
+
+    def session_cookie(self, username):
+        user = get_user_model().objects.filter(username=username).first()
+        if user is None:
+            raise CommandError(f"No user '{username}'.")
+        client = Client()
+        client.force_login(user)
+        return '; '.join(f'{name}={morsel.value}' for name, morsel in client.cookies.items())
+
+    def add_db_latency(self, seconds):
+        def delayed(execute, sql, params, many, context):
+            time.sleep(seconds)
+            return execute(sql, params, many, context)
+
+        def install(sender, connection, **kwargs):
+            connection.execute_wrappers.append(delayed)
+
+        connection_created.connect(install, weak=False)
+
+    def run_wsgi(self, paths, cookie, concurrency):
+        application = get_wsgi_application()
+
+        def request(path):
+            url = urlsplit(path)
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': url.path, 'QUERY_STRING': url.query,
+                'SERVER_NAME': HOST, 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1', 'HTTP_HOST': HOST,
+                'HTTP_COOKIE': cookie, 'REMOTE_ADDR': '127.0.0.1',
+                'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http', 'wsgi.input': BytesIO(),
+                'wsgi.errors': sys.stderr, 'wsgi.multithread': True, 'wsgi.multiprocess': False,
+                'wsgi.run_once': False,
+            }
+            status = []
+            start = time.perf_counter()
+            body = application(environ, lambda line, headers, exc_info=None: status.append(int(line[:3])))
+            try:
+                for _ in body:
+                    pass
+            finally:
+                body.close()
+            return status[0], time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            timings = list(pool.map(request, paths))
+        return self.summarise(timings, time.perf_counter() - start, concurrency)
+
+    def run_asgi(self, paths, cookie, concurrency):
+        application = get_asgi_application()
+
+        async def request(path, limit):
+            url = urlsplit(path)
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': url.path, 'raw_path': url.path.encode(),
+                'query_string': url.query.encode(), 'root_path': '',
+                'headers': [(b'host', HOST.encode()), (b'cookie', cookie.encode())],
+                'client': ('127.0.0.1', 0), 'server': (HOST, 80),
+            }
+            sent_body = asyncio.Event()
+            status = []
+
+            async def receive():
+                if not sent_body.is_set():
+                    sent_body.set()
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                # Stay connected until Django stops listening for a disconnect.
+                await asyncio.Future()
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+
+            async with limit:
+                start = time.perf_counter()
+                await application(scope, receive, send)
+                return status[0], time.perf_counter() - start
+
+        async def main():
+            limit = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(request(path, limit) for path in paths))
+
+        start = time.perf_counter()
+        timings = asyncio.run(main())
+        return self.summarise(timings, time.perf_counter() - start, concurrency)
+
+    def summarise(self, timings, elapsed, concurrency):
+        latencies = sorted(seconds * 1000 for _, seconds in timings)
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        return {
+            'requests': len(timings),
+            'concurrency': concurrency,
+            'errors': sum(1 for status, _ in timings if status >= 400),
+            'seconds': round(elapsed, 3),
+            'rps': round(len(timings) / elapsed, 1),
+            'p50_ms': round(quantiles[49], 1),
+            'p95_ms': round(quantiles[94], 1),
+            'p99_ms': round(quantiles[98], 1),
+        }
+
+    def print_results(self, results):
+        self.stdout.write(f"{'server':8} {'requests':>9} {'conc':>5} {'errors':>7} {'req/s':>9} "
+                          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for r in results:
+            self.stdout.write(
+                f"{r['server']:8} {r['requests']:>9} {r['concurrency']:>5} {r['errors']:>7} {r['rps']:>9} "
+                f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8}"
+            )
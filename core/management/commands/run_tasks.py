@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from core.tasks import claim_tasks, run_batch
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks (emails and other slow side effects)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--sleep', type=float, default=2.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit.")
+
+    def handle(self, *args, **options):
+        while True:
+            tasks = claim_tasks(options['batch_size'])
+            if tasks:
+                done, failed = run_batch(tasks)
+                self.stdout.write(f"Ran {len(tasks)} task(s): {done} done, {failed} failed or retrying.")
+                continue
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core import querystats
+
+
+class Command(BaseCommand):
+    help = (
+        "Show per-view SQL counts and timings collected by QueryStatsMiddleware. Web processes "
+        "publish their numbers to the cache, so this needs a cache shared with them (not locmem)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sort', default='db_ms', choices=querystats.SORT_FIELDS)
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--slowest', action='store_true', help="Also list each view's slowest statements.")
+
+    def handle(self, *args, **options):
+        if 'locmem' in settings.CACHES['default']['BACKEND'].lower():
+            self.stderr.write("The default cache is per process (locmem); web process numbers are not visible here.")
+
+        rows = querystats.report(querystats.collect(), sort=options['sort'], limit=options['limit'])
+        if not rows:
+            self.stdout.write("No SQL statistics recorded yet. Is SQL_STATS_ENABLED on?")
+            return
+
+        self.stdout.write(
+            f"{'view':40} {'requests':>9} {'avg q':>7} {'max q':>6} {'db ms':>10} {'avg db ms':>10} {'avg ms':>9}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['view'][:40]:40} {row['requests']:>9} {row['avg_queries']:>7} {row['max_queries']:>6} "
+                f"{row['db_ms']:>10} {row['avg_db_ms']:>10} {row['avg_ms']:>9}"
+            )
+            if options['slowest']:
+                for statement in row['slowest']:
+                    self.stdout.write(f"    {statement['ms']:>8} ms  {statement['sql'][:200]}")
@@ -0,0 +1,59 @@
+import time
+from contextlib import ExitStack
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from core.db import pin_to_primary, replica_alias
+from core.querystats import QueryRecorder, is_enabled, record
+
+
+class QueryStatsMiddleware:
+    """
+    Count and time every SQL statement a request runs, per view name.
+
+    Enabled with SQL_STATS_ENABLED; when it is off Django drops the
+    middleware at startup, so requests do not pay for it at all. Queries a
+    streaming response runs after the view returns are not included.
+    """
+
+    def __init__(self, get_response):
+        if not is_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        if match is not None:
+            record(match.view_name or match._func_path, recorder, time.perf_counter() - start)
+        return response
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class ReplicaPinMiddleware:
+    """
+    Keep a signed-in user's session on the primary database for
+    REPLICA_STICKY_SECONDS after a POST (edits, role changes), so
+    @read_from_replica views show them their own changes before the
+    replica catches up. Views that write on a GET call
+    core.db.pin_after_write themselves. Not loaded when there is no replica.
+    """
+
+    def __init__(self, get_response):
+        if not replica_alias():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, 'user', None)
+        if request.method not in SAFE_METHODS and user is not None and user.is_authenticated:
+            pin_to_primary(request.session)
+        return response
@@ -0,0 +1,145 @@
+import heapq
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+
+
+# Per-process SQL statistics for each view, kept in memory with a fixed upper size.
+MAX_VIEWS = getattr(settings, 'SQL_STATS_MAX_VIEWS', 200)
+SLOWEST_PER_VIEW = getattr(settings, 'SQL_STATS_SLOWEST', 5)
+SQL_MAX_LENGTH = 1000
+# Each process copies its numbers into the cache this often, so sql_stats can merge them.
+PUBLISH_INTERVAL = getattr(settings, 'SQL_STATS_PUBLISH_INTERVAL', 30)
+PUBLISH_TTL = 24 * 60 * 60
+PROCESS_KEY = f'sql_stats:{socket.gethostname()}:{os.getpid()}'
+PROCESSES_KEY = 'sql_stats:processes'
+
+def is_enabled():
+    return getattr(settings, 'SQL_STATS_ENABLED', False)
+
+
+_stats = OrderedDict()
+_lock = threading.Lock()
+_last_published = 0.0
+
+
+class QueryRecorder:
+    """connection.execute_wrapper that counts and times the statements of one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = []  # min-heap of (seconds, sql)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            # Only the statement text is kept, never its parameters.
+            entry = (elapsed, sql[:SQL_MAX_LENGTH])
+            if len(self.slowest) < SLOWEST_PER_VIEW:
+                heapq.heappush(self.slowest, entry)
+            elif elapsed > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, entry)
+
+
+def _empty():
+    return {'requests': 0, 'queries': 0, 'max_queries': 0, 'db_time': 0.0, 'time': 0.0, 'slowest': []}
+
+
+def _slowest(*entries):
+    """The slowest distinct statements, each at its worst time."""
+    worst = {}
+    for seconds, sql in entries:
+        worst[sql] = max(seconds, worst.get(sql, 0.0))
+    return heapq.nlargest(SLOWEST_PER_VIEW, ((seconds, sql) for sql, seconds in worst.items()))
+
+
+def record(view_name, recorder, elapsed):
+    with _lock:
+        stats = _stats.get(view_name)
+        if stats is None:
+            if len(_stats) >= MAX_VIEWS:
+                # Drop the view that has gone longest without a request.
+                _stats.popitem(last=False)
+            stats = _stats[view_name] = _empty()
+        else:
+            _stats.move_to_end(view_name)
+        stats['requests'] += 1
+        stats['queries'] += recorder.count
+        stats['max_queries'] = max(stats['max_queries'], recorder.count)
+        stats['db_time'] += recorder.duration
+        stats['time'] += elapsed
+        stats['slowest'] = _slowest(*stats['slowest'], *recorder.slowest)
+
+    if time.monotonic() - _last_published > PUBLISH_INTERVAL:
+        publish()
+
+
+def snapshot():
+    with _lock:
+        return {view: {**stats, 'slowest': list(stats['slowest'])} for view, stats in _stats.items()}
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def publish():
+    global _last_published
+    _last_published = time.monotonic()
+    cache.set(PROCESS_KEY, snapshot(), PUBLISH_TTL)
+    processes = set(cache.get(PROCESSES_KEY) or ())
+    if PROCESS_KEY not in processes:
+        cache.set(PROCESSES_KEY, processes | {PROCESS_KEY}, PUBLISH_TTL)
+
+
+def merge(*snapshots):
+    merged = {}
+    for snap in snapshots:
+        for view, stats in snap.items():
+            total = merged.setdefault(view, _empty())
+            for field in ('requests', 'queries', 'db_time', 'time'):
+                total[field] += stats[field]
+            total['max_queries'] = max(total['max_queries'], stats['max_queries'])
+            total['slowest'] = _slowest(*total['slowest'], *(tuple(entry) for entry in stats['slowest']))
+    return merged
+
+
+def collect():
+    """This process's live numbers merged with what every other process last published."""
+    keys = set(cache.get(PROCESSES_KEY) or ()) - {PROCESS_KEY}
+    published = cache.get_many(keys)
+    return merge(snapshot(), *published.values())
+
+
+SORT_FIELDS = ('db_ms', 'queries', 'avg_queries', 'max_queries', 'requests', 'avg_db_ms', 'avg_ms')
+
+
+def report(stats, sort='db_ms', limit=None):
+    """Rows per view, busiest first by the given field."""
+    rows = []
+    for view, s in stats.items():
+        requests = s['requests'] or 1
+        rows.append({
+            'view': view,
+            'requests': s['requests'],
+            'queries': s['queries'],
+            'avg_queries': round(s['queries'] / requests, 1),
+            'max_queries': s['max_queries'],
+            'db_ms': round(s['db_time'] * 1000, 1),
+            'avg_db_ms': round(s['db_time'] * 1000 / requests, 2),
+            'avg_ms': round(s['time'] * 1000 / requests, 2),
+            'slowest': [{'ms': round(seconds * 1000, 2), 'sql': sql} for seconds, sql in s['slowest']],
+        })
+    rows.sort(key=lambda row: row[sort if sort in SORT_FIELDS else 'db_ms'], reverse=True)
+    return rows[:limit] if limit else rows
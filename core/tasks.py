@@ -0,0 +1,109 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from core.models import Task
+
+
+TASKS = {}
+
+RETRY_BACKOFF_SECONDS = getattr(settings, 'TASK_RETRY_BACKOFF', 30)
+MAX_RETRY_DELAY_SECONDS = 60 * 60
+STALE_LOCK_AFTER = timedelta(minutes=10)
+
+
+def task(name, uses_mail_connection=False):
+    """Register a function that the run_tasks worker can execute by name."""
+    def decorator(func):
+        func.uses_mail_connection = uses_mail_connection
+        TASKS[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, **payload):
+    """Store a job in the outbox; it commits or rolls back with the caller's transaction."""
+    return Task.objects.create(name=name, payload=payload)
+
+
+def enqueue_many(name, payloads, batch_size=1000):
+    """Store one job per payload with batched INSERTs, for bulk operations."""
+    return Task.objects.bulk_create([Task(name=name, payload=payload) for payload in payloads], batch_size=batch_size)
+
+
+def claim_tasks(batch_size):
+    """Lock a batch of due jobs, skipping rows another worker already holds."""
+    now = timezone.now()
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='pending') | Q(status='running', locked_at__lt=now - STALE_LOCK_AFTER))
+            .filter(run_at__lte=now)
+            .order_by('run_at', 'id')[:batch_size]
+        )
+        Task.objects.filter(pk__in=[t.pk for t in tasks]).update(status='running', locked_at=now)
+    return tasks
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1), MAX_RETRY_DELAY_SECONDS))
+
+
+def run_batch(tasks):
+    """Run claimed jobs; mail jobs in the batch share a single SMTP connection."""
+    connection = None
+    done = failed = 0
+    try:
+        for job in tasks:
+            func = TASKS.get(job.name)
+            job.attempts += 1
+            try:
+                if func is None:
+                    raise LookupError(f"No task registered as '{job.name}'")
+                # Shallow copy: tasks may trim their own payload (e.g. drop mails
+                # already sent) so a retry only redoes the unfinished part.
+                kwargs = dict(job.payload)
+                if func.uses_mail_connection:
+                    if connection is None:
+                        connection = get_connection()
+                        connection.open()
+                    kwargs['connection'] = connection
+                func(**kwargs)
+            except Exception as e:
+                job.last_error = f"{type(e).__name__}: {e}"
+                if job.attempts >= job.max_attempts:
+                    job.status = 'failed'
+                else:
+                    job.status = 'pending'
+                    job.run_at = timezone.now() + retry_delay(job.attempts)
+                failed += 1
+            else:
+                job.status = 'done'
+                job.last_error = ''
+                done += 1
+            job.locked_at = None
+            job.save(update_fields=['status', 'attempts', 'run_at', 'locked_at', 'last_error', 'payload'])
+    finally:
+        if connection is not None:
+            connection.close()
+    return done, failed
+
+
+@task('send_email', uses_mail_connection=True)
+def send_email(subject, message, recipient_list, from_email=None, connection=None):
+    EmailMessage(
+        subject, message, from_email or settings.DEFAULT_FROM_EMAIL, recipient_list, connection=connection
+    ).send()
+
+
+@task('send_mass_mail', uses_mail_connection=True)
+def send_mass_mail(messages, connection=None):
+    """Send [subject, message, from_email, recipient_list] items over one connection."""
+    while messages:
+        subject, message, from_email, recipient_list = messages[0]
+        EmailMessage(
+            subject, message, from_email or settings.DEFAULT_FROM_EMAIL, recipient_list, connection=connection
+        ).send()
+        messages.pop(0)
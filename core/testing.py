@@ -0,0 +1,129 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from io import StringIO
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver
+
+
+# Set VIEW_BENCHMARK_REPORT to a file path (JSON lines) or '-' (stderr) to keep the numbers.
+REPORT_ENV = 'VIEW_BENCHMARK_REPORT'
+# Multiplies the seeded data; budgets must hold at any scale.
+SCALE_ENV = 'VIEW_BENCHMARK_SCALE'
+
+Measurement = namedtuple('Measurement', 'name method url status queries seconds peak_kib')
+
+
+def url_names(urlpatterns):
+    """Names of every route in a urls.py module's urlpatterns, including nested includes."""
+    names = set()
+    for pattern in urlpatterns:
+        if isinstance(pattern, URLResolver):
+            names |= url_names(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+def seed_benchmark_data():
+    """Seed a small site with the seed_data command, grown by VIEW_BENCHMARK_SCALE."""
+    scale = int(os.environ.get(SCALE_ENV, 1))
+    call_command(
+        'seed_data', users=80 * scale, organizers=4, categories=4, events=40 * scale, rsvps=600 * scale,
+        prefix='bench', stdout=StringIO(),
+    )
+
+
+class PrimaryDatabaseTestRunner(DiscoverRunner):
+    """
+    Run tests with read replica routing off. The replica is a TEST MIRROR of
+    the primary, but on its own connection it cannot see the uncommitted
+    data of a TestCase.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.replica_database = getattr(settings, 'REPLICA_DATABASE', None)
+        settings.REPLICA_DATABASE = None
+
+    def teardown_test_environment(self, **kwargs):
+        settings.REPLICA_DATABASE = self.replica_database
+        super().teardown_test_environment(**kwargs)
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    Request views and fail when one runs more SQL queries than its budget.
+
+    Every request is measured cold (empty cache) for query count, wall time
+    and peak Python memory, and the numbers are reported when REPORT_ENV is set.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.measurements = []
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.write_report()
+        super().tearDownClass()
+
+    @classmethod
+    def write_report(cls):
+        target = os.environ.get(REPORT_ENV)
+        if not target or not cls.measurements:
+            return
+        if target == '-':
+            sys.stderr.write(f"\n{cls.__name__}\n")
+            for m in cls.measurements:
+                sys.stderr.write(
+                    f"  {m.method:4} {m.name:32} {m.status}  {m.queries:3} queries  "
+                    f"{m.seconds * 1000:8.1f} ms  {m.peak_kib:8.0f} KiB  {m.url}\n"
+                )
+            return
+        with open(target, 'a') as f:
+            for m in cls.measurements:
+                f.write(json.dumps({'suite': cls.__name__, **m._asdict()}) + '\n')
+
+    def measure(self, name, url, method='get', data=None):
+        cache.clear()
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                response = getattr(self.client, method)(url, data or {})
+                if response.streaming:
+                    # Exports do their queries while streaming, so drain the body inside the window.
+                    for _ in response.streaming_content:
+                        pass
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.last_queries = [query['sql'] for query in queries.captured_queries]
+
+        measurement = Measurement(
+            name, method.upper(), url, response.status_code, len(queries), seconds, peak / 1024,
+        )
+        self.measurements.append(measurement)
+        return response, measurement
+
+    def assertQueryBudget(self, name, url, budget, method='get', data=None, status=200):
+        response, measurement = self.measure(name, url, method, data)
+        self.assertEqual(response.status_code, status, f"{method.upper()} {url}")
+        self.assertLessEqual(
+            measurement.queries, budget,
+            f"{method.upper()} {url} ran {measurement.queries} queries, over its budget of {budget}:\n"
+            + '\n'.join(self.last_queries),
+        )
+        return response
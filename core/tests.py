@@ -1,3 +1,102 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from datetime import date, time
+from django.contrib.sessions.models import Session
+from core import querystats
+from django.core.cache import cache
+from core.db import PINNED_UNTIL_KEY, replica_reads
+from events.cache import EVENT_FRAGMENT_TTL, with_fragment_versions
+from events.models import Category, Event
+from events.stats import dashboard_stats
 
 # Create your tests here.
+
+User = get_user_model()
+
+
+class QueryStatsTests(TestCase):
+    def setUp(self):
+        querystats.reset()
+        self.addCleanup(querystats.reset)
+
+    def test_disabled_middleware_records_nothing(self):
+        self.client.get(reverse('api-category-list'))
+        self.assertEqual(querystats.snapshot(), {})
+
+    @override_settings(SQL_STATS_ENABLED=True)
+    def test_queries_are_recorded_per_view(self):
+        self.client.get(reverse('api-category-list'))
+        self.client.get(reverse('api-category-list'))
+
+        stats = querystats.snapshot()['api-category-list']
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['queries'], 2)
+        self.assertIn('events_category', stats['slowest'][0][1])
+
+    @override_settings(SQL_STATS_ENABLED=True)
+    def test_report_is_admin_only(self):
+        user = User.objects.create_user(username='viewer', password='pw', email='viewer@example.com')
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(reverse('sql-stats')).status_code, 302)
+
+        user.groups.add(Group.objects.get_or_create(name='Admin')[0])
+        response = self.client.get(reverse('sql-stats'))
+        self.assertEqual(response.status_code, 200)
+        # The refused request above was recorded too.
+        self.assertIn('sql-stats', [row['view'] for row in response.json()['views']])
+
+
+@override_settings(REPLICA_DATABASE='replica')
+class ReplicaRoutingTests(TestCase):
+    # No 'replica' connection exists here, so a read that wrongly went to it would fail.
+
+    def test_reads_use_replica_only_when_asked(self):
+        self.assertEqual(Event.objects.all().db, 'default')
+        with replica_reads():
+            self.assertEqual(Event.objects.all().db, 'replica')
+            self.assertEqual(Event.objects.select_for_update().db, 'default')
+            self.assertEqual(Session.objects.all().db, 'default')
+
+    def test_shared_caches_are_not_filled_from_replica(self):
+        cache.clear()
+        organizer = User.objects.create_user(username='host', password='pw', email='host@example.com')
+        Event.objects.create(
+            name='Meetup', description='Monthly', date=date(2030, 1, 1), time=time(18), location='Dhaka',
+            category=Category.objects.create(name='Tech', description='Tech'), organizer=organizer,
+        )
+        events = list(Event.objects.all())
+        self.assertEqual(with_fragment_versions(events)[0].card_ttl, EVENT_FRAGMENT_TTL)
+        with replica_reads():
+            # Would fail on the missing 'replica' connection if it were read from there.
+            self.assertEqual(dashboard_stats()['total_events'], 1)
+            self.assertEqual(with_fragment_versions(events)[0].card_ttl, 0)
+
+    def test_rsvp_pins_session_to_primary(self):
+        participant = User.objects.create_user(username='reader', password='pw', email='reader@example.com')
+        participant.groups.add(Group.objects.get_or_create(name='Participant')[0])
+        organizer = User.objects.create_user(username='host', password='pw', email='host@example.com')
+        event = Event.objects.create(
+            name='Meetup', description='Monthly', date=date(2030, 1, 1), time=time(18), location='Dhaka',
+            category=Category.objects.create(name='Tech', description='Tech'), organizer=organizer,
+        )
+        self.client.force_login(participant)
+
+        # The RSVP button is a plain link, so the write arrives as a GET.
+        self.client.get(reverse('event_rsvp', args=[event.id]))
+        self.assertIn(PINNED_UNTIL_KEY, self.client.session)
+        response = self.client.get(reverse('event_detail', args=[event.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['event'].is_rsvped)
+
+    def test_remove_participant_pins_session_to_primary(self):
+        admin = User.objects.create_user(username='boss', password='pw', email='boss@example.com')
+        admin.groups.set([Group.objects.get_or_create(name='Admin')[0]])
+        participant = User.objects.create_user(username='guest', password='pw', email='guest@example.com')
+        self.client.force_login(admin)
+
+        response = self.client.get(reverse('remove-participant', args=[participant.id]))
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(participant.groups.filter(name='Participant').exists())
+        self.assertIn(PINNED_UNTIL_KEY, self.client.session)
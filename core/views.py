@@ -1,6 +1,26 @@
 from django.shortcuts import render
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+from core import querystats
+from users.views import is_admin
 
 # Create your views here.
 
 def no_permission(request):
-    return render(request, 'no_permission.html')
\ No newline at end of file
+    return render(request, 'no_permission.html')
+
+
+@login_required
+@user_passes_test(lambda user: user.is_superuser or is_admin(user), login_url='no-permission')
+@require_http_methods(['GET', 'POST'])
+def sql_stats(request):
+    """Per-view SQL numbers from core.middleware.QueryStatsMiddleware; POST clears this process's."""
+    if request.method == 'POST':
+        querystats.reset()
+        querystats.publish()
+    limit = request.GET.get('limit', '')
+    rows = querystats.report(
+        querystats.collect(), sort=request.GET.get('sort', 'db_ms'), limit=int(limit) if limit.isdigit() else None,
+    )
+    return JsonResponse({'enabled': querystats.is_enabled(), 'views': rows})
\ No newline at end of file
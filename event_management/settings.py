@@ -31,19 +31,20 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'events',
-    'debug_toolbar',
     'users',
     'core',
 ]
 
 MIDDLEWARE = [
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.QueryStatsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -51,6 +52,18 @@ INTERNAL_IPS = [
     '127.0.0.1',
 ]
 
+# debug_toolbar is a development tool; it is only loaded when asked for.
+DEBUG_TOOLBAR = config('DEBUG_TOOLBAR', default=False, cast=bool)
+if DEBUG_TOOLBAR:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.insert(0, 'debug_toolbar.middleware.DebugToolbarMiddleware')
+
+# Serve event_list, event_detail and event_rsvp from events.async_views (for ASGI).
+ASYNC_EVENT_VIEWS = config('ASYNC_EVENT_VIEWS', default=False, cast=bool)
+
+# Per-view SQL counts and timings (core.middleware.QueryStatsMiddleware), safe for production.
+SQL_STATS_ENABLED = config('SQL_STATS_ENABLED', default=False, cast=bool)
+
 ROOT_URLCONF = 'event_management.urls'
 
 TEMPLATES = [
@@ -102,10 +115,61 @@ DATABASES = {
         'USER': config('DB_USER', default=''),
         'PASSWORD': config('DB_PASSWORD', default=''),
         'HOST': config('DB_HOST', default='localhost'),
-        'PORT': config('DB_PORT',  default='', cast=int)
+        'PORT': config('DB_PORT',  default='', cast=int),
+        # Reuse connections across requests; health checks replace ones the server has dropped.
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        # Required behind PgBouncer in transaction pooling mode.
+        'DISABLE_SERVER_SIDE_CURSORS': config('DB_DISABLE_SERVER_SIDE_CURSORS', default=False, cast=bool),
     }
 }
 
+# Optional read replica. core.db.ReplicaRouter sends the reads of @read_from_replica
+# views (dashboards, exports) to it; tests run against the primary only.
+if config('DB_REPLICA_HOST', default='') or config('DB_REPLICA_NAME', default=''):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': config('DB_REPLICA_NAME', default=DATABASES['default']['NAME']),
+        'HOST': config('DB_REPLICA_HOST', default=DATABASES['default']['HOST']),
+        'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT'], cast=int),
+        'CONN_MAX_AGE': config('DB_REPLICA_CONN_MAX_AGE', default=DATABASES['default']['CONN_MAX_AGE'], cast=int),
+        'TEST': {'MIRROR': 'default'},
+    }
+REPLICA_DATABASE = 'replica' if 'replica' in DATABASES else None
+# After writing, a session reads from the primary for this long so it sees its own changes.
+REPLICA_STICKY_SECONDS = config('DB_REPLICA_STICKY_SECONDS', default=10, cast=int)
+DATABASE_ROUTERS = ['core.db.ReplicaRouter']
+TEST_RUNNER = 'core.testing.PrimaryDatabaseTestRunner'
+
+# Sessions, user snapshots, roles and rendered pages are cached. The local memory
+# default is per process; with several workers point CACHE_BACKEND/CACHE_LOCATION
+# at a shared cache (e.g. django.core.cache.backends.redis.RedisCache, redis://...)
+# so a sign-out or an invalidation in one worker reaches the others.
+CACHE_BACKEND = config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+SHARED_CACHE = CACHE_BACKEND not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+# With a shared cache, authenticated requests read the session and the user
+# from it, falling back to the database (users.backends.CachedModelBackend).
+# Not in a per-process cache: a sign-out, a password change or a deactivation
+# would only reach the worker that made it.
+SESSION_ENGINE = (
+    'django.contrib.sessions.backends.cached_db' if SHARED_CACHE
+    else 'django.contrib.sessions.backends.db'
+)
+AUTHENTICATION_BACKENDS = [
+    'users.backends.CachedModelBackend' if SHARED_CACHE
+    else 'django.contrib.auth.backends.ModelBackend'
+]
+USER_CACHE_TTL = config('USER_CACHE_TTL', default=300, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -152,7 +216,7 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = config('EMAIL_HOST')
 EMAIL_USE_TLS = config('EMAIL_USE_TLS')
 EMAIL_PORT = config('EMAIL_PORT')
@@ -1,16 +1,19 @@
 from django.contrib import admin
 from django.urls import path, include
-from core.views import no_permission
+from core.views import no_permission, sql_stats
 from django.conf import settings
 from django.conf.urls.static import static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('events.urls')),
-    path('__debug__/', include('debug_toolbar.urls')),
     path('users/', include('users.urls')),
-    path('no-permission/', no_permission, name='no-permission')
+    path('no-permission/', no_permission, name='no-permission'),
+    path('sql-stats/', sql_stats, name='sql-stats'),
 ]
 
+if 'debug_toolbar' in settings.INSTALLED_APPS:
+    urlpatterns.append(path('__debug__/', include('debug_toolbar.urls')))
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -1,6 +1,7 @@
 from django.contrib import admin
-from .models import Event, Category
+from .models import Event, Category, DailyEventRollup
 
 admin.site.register(Event)
 # admin.site.register(Participant)
 admin.site.register(Category)
+admin.site.register(DailyEventRollup)
@@ -0,0 +1,114 @@
+import hashlib
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db.models import F
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition, require_GET
+from events.cache import get_content_version
+from events.models import Event, Category
+from events.pagination import paginate
+from events.views import filter_events
+
+
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+# Public name -> model field or expression. Everything is read with .values(),
+# so only the columns a client asks for are selected and serialized.
+EVENT_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'description': 'description',
+    'date': 'date',
+    'time': 'time',
+    'location': 'location',
+    'category_id': 'category_id',
+    'category_name': F('category__name'),
+    'organizer_id': 'organizer_id',
+    'participant_count': 'participant_count',
+    'capacity': 'capacity',
+    'image': F('event_image'),
+    'updated_at': 'updated_at',
+}
+DEFAULT_EVENT_FIELDS = [name for name in EVENT_FIELDS if name != 'description']
+
+
+def api_etag(request, *args, **kwargs):
+    """Every API response is derived from public data covered by the content version."""
+    return hashlib.md5(f'{get_content_version()}:{request.get_full_path()}'.encode()).hexdigest()
+
+
+def api_error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def requested_fields(request):
+    fields = request.GET.get('fields')
+    if not fields:
+        return DEFAULT_EVENT_FIELDS
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = [name for name in names if name not in EVENT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return names
+
+
+def event_values(events, fields, extra=()):
+    plain = [EVENT_FIELDS[name] for name in fields if isinstance(EVENT_FIELDS[name], str)]
+    expressions = {name: EVENT_FIELDS[name] for name in fields if not isinstance(EVENT_FIELDS[name], str)}
+    return events.values(*plain, *[name for name in extra if name not in plain], **expressions)
+
+
+def serialize_event(row, fields):
+    data = {name: row[name] for name in fields}
+    if 'image' in data:
+        data['image'] = default_storage.url(data['image']) if data['image'] else None
+    return data
+
+
+@require_GET
+@condition(etag_func=api_etag)
+def event_list_api(request):
+    try:
+        fields = requested_fields(request)
+        limit = min(int(request.GET.get('limit', API_PAGE_SIZE)), API_MAX_PAGE_SIZE)
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        events, ordering = filter_events(Event.objects.all(), request.GET)
+        page = paginate(request, event_values(events, fields, extra=[name.lstrip('-') for name in ordering]), ordering, per_page=limit)
+    except ValidationError as e:
+        return api_error(' '.join(e.messages))
+    except ValueError as e:
+        return api_error(str(e))
+
+    return JsonResponse({
+        'results': [serialize_event(row, fields) for row in page],
+        'next': request.build_absolute_uri(request.path + page.next_url) if page.next_url else None,
+        'previous': request.build_absolute_uri(request.path + page.prev_url) if page.prev_url else None,
+    })
+
+
+@require_GET
+@condition(etag_func=api_etag)
+def event_detail_api(request, id):
+    try:
+        fields = requested_fields(request) if request.GET.get('fields') else list(EVENT_FIELDS)
+    except ValueError as e:
+        return api_error(str(e))
+    row = get_object_or_404(event_values(Event.objects.all(), fields), id=id)
+    return JsonResponse(serialize_event(row, fields))
+
+
+@require_GET
+@condition(etag_func=api_etag)
+def event_participant_count_api(request, id):
+    row = get_object_or_404(Event.objects.values('id', 'participant_count', 'capacity'), id=id)
+    return JsonResponse(row)
+
+
+@require_GET
+@condition(etag_func=api_etag)
+def category_list_api(request):
+    categories = Category.objects.order_by('name', 'id').values('id', 'name', 'description')
+    return JsonResponse({'results': list(categories)})
@@ -0,0 +1,108 @@
+import asyncio
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.shortcuts import aget_object_or_404, redirect, render
+from django.urls import reverse
+from core.db import apin_after_write
+from events.cache import awith_fragment_versions, cache_anonymous_page, conditional_page
+from events.models import Event, Category
+from events.pagination import apaginate, EVENTS_PER_PAGE
+from events.stats import participant_total
+from events.views import (
+    filter_events, is_participant, event_attendees, event_detail_context, event_last_modified, EVENT_LIST_PARAMS,
+    RSVP_MESSAGES,
+)
+
+
+# Native async versions of the public event views, used instead of the ones in
+# events.views when ASYNC_EVENT_VIEWS is on (see events/urls.py). Under ASGI a
+# request waiting on the database no longer holds a worker thread.
+
+
+async def load_user(request):
+    """Resolve request.user without a sync query; templates and context processors read it."""
+    request.user = await request.auser()
+    return request.user
+
+
+async def amark_rsvped(events, user):
+    """mark_rsvped() for async views."""
+    rsvped_ids = set()
+    if user.is_authenticated and events:
+        rsvped_ids = {
+            event_id async for event_id in
+            user.rsvp_events.filter(id__in=[event.id for event in events]).values_list('id', flat=True)
+        }
+    for event in events:
+        event.is_rsvped = event.id in rsvped_ids
+    return events
+
+
+async def alist(queryset):
+    return [obj async for obj in queryset]
+
+
+async def arender(request, template_name, context):
+    # Rendering may still touch the session (flash messages), which is sync only.
+    return await sync_to_async(render)(request, template_name, context)
+
+
+# Event List view
+# Primary only, like events.views.event_list.
+@conditional_page(params=EVENT_LIST_PARAMS)
+@cache_anonymous_page(params=EVENT_LIST_PARAMS)
+async def event_list(request):
+    user = await load_user(request)
+    events = Event.objects.select_related('category').defer('search_vector')
+    events, ordering = filter_events(events, request.GET)
+
+    # None of these depends on another, so they are awaited together.
+    page, categories, total_participants = await asyncio.gather(
+        apaginate(request, events, ordering, per_page=EVENTS_PER_PAGE),
+        alist(Category.objects.all()),
+        sync_to_async(participant_total)(),
+    )
+    page.object_list = await awith_fragment_versions(page.object_list)
+    await amark_rsvped(page.object_list, user)
+
+    context = {
+        'events': page,
+        'page': page,
+        'categories': categories,
+        'total_participants': total_participants,
+    }
+    return await arender(request, 'events/event_list.html', context)
+
+
+@conditional_page(last_modified_func=event_last_modified)
+@cache_anonymous_page()
+async def event_detail(request, id):
+    user = await load_user(request)
+    event_query = Event.objects.select_related('category')
+    if user.is_authenticated:
+        event, attendees, is_rsvped = await asyncio.gather(
+            aget_object_or_404(event_query, id=id),
+            alist(event_attendees(id)),
+            user.rsvp_events.filter(id=id).aexists(),
+        )
+    else:
+        event, attendees = await asyncio.gather(aget_object_or_404(event_query, id=id), alist(event_attendees(id)))
+        is_rsvped = False
+    event.is_rsvped = is_rsvped
+
+    return await arender(request, 'events/event_detail.html', event_detail_context(event, attendees))
+
+
+@login_required
+@user_passes_test(is_participant, login_url='no-permission')
+async def event_rsvp(request, id):
+    event = await aget_object_or_404(Event, id=id)
+    user = await request.auser()
+
+    # toggle_rsvp locks the event row in a transaction, which the async ORM cannot do.
+    level, message = RSVP_MESSAGES[await sync_to_async(event.toggle_rsvp)(user)]
+    messages.add_message(request, level, message)
+
+    await apin_after_write(request)
+    return redirect(reverse('event_detail', kwargs={'id': event.id}))
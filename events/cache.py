@@ -0,0 +1,332 @@
+import asyncio
+import hashlib
+import time
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+from core.db import reading_from_replica
+
+
+# Rendered event cards/rows are cached under (event id, version); bumping the
+# version makes the old fragment unreachable so it simply ages out.
+EVENT_FRAGMENT_TTL = 60 * 60
+
+
+def _event_version_key(event_id):
+    return f'event_version:{event_id}'
+
+
+def _new_version():
+    # Time based rather than a counter so a version lost to eviction can never
+    # come back as a number an old fragment was cached under.
+    return time.time_ns()
+
+
+def get_event_versions(event_ids):
+    keys = {_event_version_key(event_id): event_id for event_id in event_ids}
+    found = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return {keys[key]: version for key, version in found.items()}
+
+
+async def aget_event_versions(event_ids):
+    """get_event_versions() for async views."""
+    keys = {_event_version_key(event_id): event_id for event_id in event_ids}
+    found = await cache.aget_many(keys)
+    missing = {key: _new_version() for key in keys if key not in found}
+    if missing:
+        await cache.aset_many(missing, None)
+        found.update(missing)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def bump_event_versions(event_ids):
+    version = _new_version()
+    cache.set_many({_event_version_key(event_id): version for event_id in event_ids}, None)
+
+
+def _month_version_key(day):
+    # str() of a date (or an ISO date string) starts with YYYY-MM.
+    return f'calendar_version:{str(day)[:7]}'
+
+
+def get_month_versions(months):
+    """Versions of the calendar month windows starting on the given first days."""
+    keys = {_month_version_key(month): month for month in months}
+    found = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def bump_month_versions(days):
+    """Retire the cached calendar windows of the months these event dates fall in."""
+    version = _new_version()
+    cache.set_many({_month_version_key(day): version for day in days}, None)
+
+
+def calendar_filter_key(filters):
+    """Cache key part for calendar filters such as {'category_id': 3}."""
+    return ','.join(f'{name}={filters[name]}' for name in sorted(filters)) or 'all'
+
+
+def calendar_title_key(filters):
+    return f'calendar_title:{calendar_filter_key(filters)}'
+
+
+def expire_calendar_title(**filters):
+    """Drop the cached feed title of a category or organizer that was renamed or deleted."""
+    cache.delete(calendar_title_key(filters))
+
+
+def with_fragment_versions(events):
+    """
+    Evaluate events and set card_version and card_ttl on each for
+    {% cache event.card_ttl ... event.id event.card_version %}.
+
+    Rows read from a replica may predate the current version, so their
+    fragments are rendered but not stored (a TTL of 0).
+    """
+    events = list(events)
+    return _set_fragment_versions(events, get_event_versions([event.id for event in events]))
+
+
+async def awith_fragment_versions(events):
+    """with_fragment_versions() for async views; events is already a list."""
+    return _set_fragment_versions(events, await aget_event_versions([event.id for event in events]))
+
+
+def _set_fragment_versions(events, versions):
+    ttl = 0 if reading_from_replica() else EVENT_FRAGMENT_TTL
+    for event in events:
+        event.card_version = versions[event.id]
+        event.card_ttl = ttl
+    return events
+
+
+# Whole-page cache for anonymous visitors. Any event, category or RSVP change
+# bumps CONTENT_VERSION_KEY, which retires every cached page at once.
+CONTENT_VERSION_KEY = 'content_version'
+PAGE_CACHE_TTL = 60
+PAGE_STALE_GRACE = 5 * 60
+PAGE_REBUILD_LOCK_TTL = 30
+PAGE_REBUILD_WAIT = 0.05
+PAGE_REBUILD_WAIT_STEPS = 10
+
+
+def get_content_version():
+    version = cache.get(CONTENT_VERSION_KEY)
+    if version is None:
+        cache.add(CONTENT_VERSION_KEY, _new_version(), None)
+        version = cache.get(CONTENT_VERSION_KEY)
+    return version
+
+
+async def aget_content_version():
+    version = await cache.aget(CONTENT_VERSION_KEY)
+    if version is None:
+        await cache.aadd(CONTENT_VERSION_KEY, _new_version(), None)
+        version = await cache.aget(CONTENT_VERSION_KEY)
+    return version
+
+
+def bump_content_version():
+    cache.set(CONTENT_VERSION_KEY, _new_version(), None)
+
+
+def _page_cache_key(request, view_name, params, view_kwargs, version=None):
+    """Pass the content version from async code, which can't read it synchronously."""
+    parts = [f'{name}={view_kwargs[name]}' for name in sorted(view_kwargs)]
+    for name in params:
+        value = ' '.join(request.GET.get(name, '').split())
+        if value:
+            parts.append(f'{name}={value}')
+    digest = hashlib.md5('&'.join(parts).encode()).hexdigest()
+    if version is None:
+        version = get_content_version()
+    return f'page:{view_name}:{version}:{digest}'
+
+
+def _response_from_entry(entry):
+    response = HttpResponse(entry['content'], content_type=entry['content_type'])
+    patch_vary_headers(response, ['Cookie'])
+    return response
+
+
+def cache_anonymous_page(params=(), timeout=PAGE_CACHE_TTL):
+    """
+    Serve a view's rendered HTML from the cache for anonymous GETs.
+
+    The key is the view, its URL kwargs and the normalised values of the
+    given query parameters. When an entry goes stale only the worker that
+    wins the rebuild lock renders it again; everyone else keeps getting the
+    stale copy (or briefly waits for the first render) instead of piling
+    onto the database. Works on both sync and async views.
+    """
+    def decorator(view):
+        def bypass(request, user):
+            return (
+                request.method != 'GET'
+                or user.is_authenticated
+                # A pending flash message would otherwise be baked into the shared page.
+                or CookieStorage.cookie_name in request.COOKIES
+            )
+
+        def fresh(entry):
+            return entry is not None and entry['fresh_until'] > time.time()
+
+        def entry_for(response):
+            if response.status_code != 200 or response.streaming:
+                return None
+            patch_vary_headers(response, ['Cookie'])
+            return {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'fresh_until': time.time() + timeout,
+            }
+
+        def store(key, response):
+            entry = entry_for(response)
+            if entry is not None:
+                cache.set(key, entry, timeout + PAGE_STALE_GRACE)
+
+        if iscoroutinefunction(view):
+            # Same flow as the sync wrapper below, on the cache's async API so a
+            # network cache does not block the event loop.
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if bypass(request, await request.auser()):
+                    return await view(request, *args, **kwargs)
+
+                key = _page_cache_key(request, view.__name__, params, kwargs, await aget_content_version())
+                entry = await cache.aget(key)
+                if fresh(entry):
+                    return _response_from_entry(entry)
+
+                if not await cache.aadd(f'{key}:lock', 1, PAGE_REBUILD_LOCK_TTL):
+                    for _ in range(0 if entry else PAGE_REBUILD_WAIT_STEPS):
+                        await asyncio.sleep(PAGE_REBUILD_WAIT)
+                        entry = await cache.aget(key)
+                        if entry:
+                            break
+                    if entry:
+                        return _response_from_entry(entry)
+                    return await view(request, *args, **kwargs)
+
+                try:
+                    response = await view(request, *args, **kwargs)
+                    entry = entry_for(response)
+                    if entry is not None:
+                        await cache.aset(key, entry, timeout + PAGE_STALE_GRACE)
+                finally:
+                    await cache.adelete(f'{key}:lock')
+                return response
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if bypass(request, request.user):
+                return view(request, *args, **kwargs)
+
+            key = _page_cache_key(request, view.__name__, params, kwargs)
+            entry = cache.get(key)
+            if fresh(entry):
+                return _response_from_entry(entry)
+
+            if not cache.add(f'{key}:lock', 1, PAGE_REBUILD_LOCK_TTL):
+                for _ in range(0 if entry else PAGE_REBUILD_WAIT_STEPS):
+                    time.sleep(PAGE_REBUILD_WAIT)
+                    entry = cache.get(key)
+                    if entry:
+                        break
+                if entry:
+                    return _response_from_entry(entry)
+                return view(request, *args, **kwargs)
+
+            try:
+                response = view(request, *args, **kwargs)
+                store(key, response)
+            finally:
+                cache.delete(f'{key}:lock')
+            return response
+        return wrapper
+    return decorator
+
+
+def _viewer_fingerprint(request):
+    """The parts of the user that change the page chrome (base template, avatar)."""
+    user = request.user
+    if not user.is_authenticated:
+        return 'anonymous'
+    return f'{user.pk}:{user.is_staff}:{user.profile_image.name}'
+
+
+def conditional_page(params=(), last_modified_func=None):
+    """
+    ETag / Last-Modified support for the public event pages.
+
+    The ETag is built from the content version, the view arguments and the
+    viewer, so a matching If-None-Match is answered with 304 before the view
+    runs any of its queries or renders a template. Only a 200 carries the
+    validators, so an error page such as a 404 is never revalidated.
+    """
+    def decorator(view):
+        def etag_for(request, key):
+            return hashlib.md5(f'{key}:{_viewer_fingerprint(request)}'.encode()).hexdigest()
+
+        def etag_func(request, *args, **kwargs):
+            if CookieStorage.cookie_name in request.COOKIES:
+                return None
+            return etag_for(request, _page_cache_key(request, view.__name__, params, kwargs))
+
+        def last_modified(request, *args, **kwargs):
+            if last_modified_func is None or CookieStorage.cookie_name in request.COOKIES:
+                return None
+            return last_modified_func(request, *args, **kwargs)
+
+        def revalidate(request, response):
+            if response.status_code not in (200, 304):
+                # condition() tags every response, and a client that sent the tag of a
+                # 404 back would get a 304 for the missing page until the version changed.
+                del response['ETag']
+                del response['Last-Modified']
+            # Let browsers keep the page but always revalidate it.
+            if request.user.is_authenticated:
+                patch_cache_control(response, no_cache=True, private=True)
+            else:
+                patch_cache_control(response, no_cache=True)
+            return response
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                # condition() calls the ETag/Last-Modified functions synchronously, so
+                # load the user, the content version and the modification time first.
+                request.user = await request.auser()
+                modified = await sync_to_async(last_modified)(request, *args, **kwargs)
+                etag = None
+                if CookieStorage.cookie_name not in request.COOKIES:
+                    version = await aget_content_version()
+                    etag = etag_for(request, _page_cache_key(request, view.__name__, params, kwargs, version))
+                conditional_view = condition(
+                    etag_func=lambda *a, **kw: etag, last_modified_func=lambda *a, **kw: modified,
+                )(view)
+                return revalidate(request, await conditional_view(request, *args, **kwargs))
+            return async_wrapper
+
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            return revalidate(request, conditional_view(request, *args, **kwargs))
+        return wrapper
+    return decorator
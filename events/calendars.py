@@ -0,0 +1,172 @@
+import calendar
+import hashlib
+from collections import defaultdict
+from datetime import date, timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from events.cache import cache_anonymous_page, calendar_filter_key, calendar_title_key, get_month_versions
+from events.exports import ICS_EVENT_FIELDS, ics_calendar, ics_event, ics_line
+from events.models import Event, Category
+
+
+# Month calendar and subscribable iCalendar feeds. Events are fetched one
+# month window at a time and cached per (month, filter) under the month's
+# version, which events.signals bumps when an event in that month changes.
+# An edit therefore costs the next reader one range query for one month;
+# everything else comes from the cache.
+
+# Cached windows and feeds are keyed by version, so they never go stale; the TTL only frees memory.
+CALENDAR_CACHE_TTL = 24 * 60 * 60
+# Months before and after the current one that a subscribed feed covers.
+CALENDAR_FEED_MONTHS_BEFORE = getattr(settings, 'CALENDAR_FEED_MONTHS_BEFORE', 1)
+CALENDAR_FEED_MONTHS_AFTER = getattr(settings, 'CALENDAR_FEED_MONTHS_AFTER', 12)
+# How long calendar clients and proxies may reuse a feed before asking again.
+CALENDAR_FEED_MAX_AGE = getattr(settings, 'CALENDAR_FEED_MAX_AGE', 15 * 60)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def parse_month(value):
+    """First day of a 'YYYY-MM' month, or of the current month."""
+    try:
+        year, month = (int(part) for part in value.split('-'))
+        if not 1 < year < 9999:  # room for the previous/next month links
+            raise ValueError(year)
+        return date(year, month, 1)
+    except ValueError:
+        return timezone.localdate().replace(day=1)
+
+
+def month_windows(months, versions=None, **filters):
+    """Rows (ICS_EVENT_FIELDS) of each month's events matching filters, by month."""
+    versions = versions or get_month_versions(months)
+    keys = {
+        month: f'calendar_window:{month:%Y-%m}:{calendar_filter_key(filters)}:{versions[month]}' for month in months
+    }
+    cached = cache.get_many(keys.values())
+    windows = {month: cached[key] for month, key in keys.items() if key in cached}
+    missing = [month for month in months if month not in windows]
+    if missing:
+        # One query for all the missing months, each as its own date range.
+        ranges = Q()
+        for month in missing:
+            windows[month] = []
+            ranges |= Q(date__range=(month, add_months(month, 1) - timedelta(days=1)))
+        rows = Event.objects.filter(ranges, **filters).order_by('date', 'time', 'id').values(*ICS_EVENT_FIELDS)
+        for row in rows:
+            windows[row['date'].replace(day=1)].append(row)
+        cache.set_many({keys[month]: windows[month] for month in missing}, CALENDAR_CACHE_TTL)
+    return windows
+
+
+def calendar_filters(params):
+    """category/organizer ids from the query string, as filters for month_windows."""
+    return {
+        f'{name}_id': int(params[name])
+        for name in ('category', 'organizer') if params.get(name, '').isdigit()
+    }
+
+
+def calendar_title(filters):
+    if 'category_id' in filters:
+        category = Category.objects.filter(pk=filters['category_id']).values_list('name', flat=True).first()
+        return f"{category or 'Unknown category'} events"
+    if 'organizer_id' in filters:
+        organizer = get_user_model().objects.filter(pk=filters['organizer_id']).values_list('username', flat=True).first()
+        return f"Events by {organizer or 'unknown organizer'}"
+    return 'All events'
+
+
+def feed_title(filters):
+    """calendar_title(), cached until the category or organizer changes (events.signals)."""
+    key = calendar_title_key(filters)
+    title = cache.get(key)
+    if title is None:
+        title = calendar_title(filters)
+        cache.set(key, title, CALENDAR_CACHE_TTL)
+    return title
+
+
+def feed_url(filters):
+    if 'category_id' in filters:
+        return reverse('category_calendar_feed', kwargs={'category_id': filters['category_id']})
+    if 'organizer_id' in filters:
+        return reverse('organizer_calendar_feed', kwargs={'organizer_id': filters['organizer_id']})
+    return reverse('calendar_feed')
+
+
+# Not @read_from_replica: a window rebuilt from a lagging replica right after
+# a version bump would be cached as current until the next change.
+@cache_anonymous_page(params=('month', 'category', 'organizer'))
+def event_calendar(request):
+    month = parse_month(request.GET.get('month', ''))
+    filters = calendar_filters(request.GET)
+    events_by_day = defaultdict(list)
+    for row in month_windows([month], **filters)[month]:
+        events_by_day[row['date']].append(row)
+
+    # Django's FIRST_DAY_OF_WEEK counts from Sunday, the calendar module from Monday.
+    first_weekday = (settings.FIRST_DAY_OF_WEEK - 1) % 7
+    weeks = [
+        [{'day': day, 'in_month': day.month == month.month, 'events': events_by_day.get(day, [])} for day in week]
+        for week in calendar.Calendar(first_weekday).monthdatescalendar(month.year, month.month)
+    ]
+    context = {
+        'month': month,
+        'weeks': weeks,
+        'weekdays': [calendar.day_abbr[(first_weekday + i) % 7] for i in range(7)],
+        'previous_month': add_months(month, -1),
+        'next_month': add_months(month, 1),
+        'title': calendar_title(filters),
+        'filters': {name[:-3]: value for name, value in filters.items()},
+        'filter_query': ''.join(f'&{name[:-3]}={value}' for name, value in filters.items()),
+        'categories': Category.objects.all(),
+        'feed_url': request.build_absolute_uri(feed_url(filters)),
+    }
+    return render(request, 'events/event_calendar.html', context)
+
+
+def calendar_feed(request, **filters):
+    """
+    iCalendar feed of every event from CALENDAR_FEED_MONTHS_BEFORE months
+    ago to CALENDAR_FEED_MONTHS_AFTER months ahead. Public, since calendar
+    clients cannot sign in; it carries no attendee data.
+    """
+    this_month = timezone.localdate().replace(day=1)
+    months = [
+        add_months(this_month, offset)
+        for offset in range(-CALENDAR_FEED_MONTHS_BEFORE, CALENDAR_FEED_MONTHS_AFTER + 1)
+    ]
+    versions = get_month_versions(months)
+    title = feed_title(filters)
+    # The body embeds absolute event URLs, so the scheme and host are part of it,
+    # and the calendar name, so renaming the category or organizer changes it too.
+    site = request.build_absolute_uri('/')
+    fingerprint = '|'.join([
+        site, calendar_filter_key(filters), title, *(f'{m:%Y-%m}={versions[m]}' for m in months),
+    ])
+    etag = f'"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        key = f'calendar_feed:{etag}'
+        content = cache.get(key)
+        if content is None:
+            windows = month_windows(months, versions, **filters)
+            body = (ics_event(request, row) + ics_line('END:VEVENT') for month in months for row in windows[month])
+            content = ''.join(ics_calendar(body, name=title))
+            cache.set(key, content, CALENDAR_CACHE_TTL)
+        response = HttpResponse(content, content_type='text/calendar; charset=utf-8')
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=CALENDAR_FEED_MAX_AGE)
+    return response
@@ -0,0 +1,210 @@
+import csv
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import HttpResponseForbidden, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+from core.db import read_from_replica
+from events.models import Event
+from events.signals import Participation
+from events.views import is_organizer_or_admin
+from users.views import is_admin
+
+
+# Rows fetched per round trip; exports never hold more than this in memory.
+EXPORT_CHUNK_SIZE = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+ATTENDEE_FIELDS = (
+    'customuser__username', 'customuser__first_name', 'customuser__last_name',
+    'customuser__email', 'customuser__phone',
+)
+ATTENDEE_HEADER = ['Username', 'First name', 'Last name', 'Email', 'Phone']
+
+
+class Echo:
+    """File-like object for csv.writer that hands each row back instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+# Spreadsheets run a cell that starts with one of these as a formula.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def csv_safe(value):
+    """Quote user-entered text that a spreadsheet would evaluate (CSV formula injection)."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def stream_csv(header, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([csv_safe(value) for value in row])
+
+
+def export_response(content, content_type, filename):
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    response['Cache-Control'] = 'private, no-store'
+    return response
+
+
+def can_export_event(user, organizer_id):
+    return organizer_id == user.id or user.is_superuser or is_admin(user)
+
+
+def export_organizer(request):
+    """The organizer whose events are exported; admins may pick one with ?organizer=."""
+    if is_admin(request.user) and request.GET.get('organizer', '').isdigit():
+        return int(request.GET['organizer'])
+    return request.user.id
+
+
+# iCalendar (RFC 5545)
+def ics_escape(value):
+    return (
+        str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def ics_line(line):
+    """Fold a content line at 75 octets without splitting a UTF-8 character."""
+    chunks, current, size = [], '', 0
+    for char in line:
+        width = len(char.encode())
+        if size + width > 75:
+            chunks.append(current)
+            current, size = ' ', 1
+        current += char
+        size += width
+    chunks.append(current)
+    return '\r\n'.join(chunks) + '\r\n'
+
+
+def ics_datetime(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def ics_event_start(event_date, event_time):
+    return ics_datetime(timezone.make_aware(datetime.combine(event_date, event_time)))
+
+
+def ics_event(request, row):
+    """VEVENT properties for a values() row of an event; END:VEVENT is left to the caller."""
+    url = request.build_absolute_uri(reverse('event_detail', kwargs={'id': row['id']}))
+    lines = [
+        'BEGIN:VEVENT',
+        f"UID:event-{row['id']}@{request.get_host()}",
+        f"DTSTAMP:{ics_datetime(row['updated_at'])}",
+        f"DTSTART:{ics_event_start(row['date'], row['time'])}",
+        f"SUMMARY:{ics_escape(row['name'])}",
+        f"LOCATION:{ics_escape(row['location'])}",
+        f"DESCRIPTION:{ics_escape(row['description'])}",
+        f"URL:{url}",
+    ]
+    return ''.join(ics_line(line) for line in lines)
+
+
+def ics_calendar(body, name=None):
+    yield ics_line('BEGIN:VCALENDAR')
+    yield ics_line('VERSION:2.0')
+    yield ics_line('PRODID:-//Event Bangla//Events//EN')
+    yield ics_line('CALSCALE:GREGORIAN')
+    if name:
+        # Shown as the calendar's title by clients that subscribe to it.
+        yield ics_line(f'X-WR-CALNAME:{ics_escape(name)}')
+    yield from body
+    yield ics_line('END:VCALENDAR')
+
+
+ICS_EVENT_FIELDS = ('id', 'name', 'description', 'location', 'date', 'time', 'updated_at')
+
+
+# Per-event exports
+@login_required
+@read_from_replica
+def event_participants_csv(request, id):
+    event = get_object_or_404(Event.objects.only('id', 'name', 'organizer_id'), id=id)
+    if not can_export_event(request.user, event.organizer_id):
+        return HttpResponseForbidden("You do not have permission to export this event.")
+
+    rows = (
+        Participation.objects.filter(event_id=event.id)
+        .order_by('customuser__username')
+        .values_list(*ATTENDEE_FIELDS)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    return export_response(stream_csv(ATTENDEE_HEADER, rows), 'text/csv', f'event-{event.id}-participants.csv')
+
+
+@login_required
+@read_from_replica
+def event_ics(request, id):
+    event = get_object_or_404(Event.objects.values(*ICS_EVENT_FIELDS, 'organizer_id'), id=id)
+    include_attendees = can_export_event(request.user, event['organizer_id'])
+
+    def body():
+        yield ics_event(request, event)
+        if include_attendees:
+            attendees = (
+                Participation.objects.filter(event_id=event['id'])
+                .order_by('customuser__username')
+                .values_list('customuser__username', 'customuser__email')
+                .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+            )
+            for username, email in attendees:
+                yield ics_line(f'ATTENDEE;CN="{username}":mailto:{email}')
+        yield ics_line('END:VEVENT')
+
+    return export_response(ics_calendar(body()), 'text/calendar; charset=utf-8', f"event-{event['id']}.ics")
+
+
+# Per-organizer exports
+@login_required
+@user_passes_test(is_organizer_or_admin, login_url='no-permission')
+@read_from_replica
+def organizer_events_csv(request):
+    rows = (
+        Event.objects.filter(organizer_id=export_organizer(request))
+        .order_by('date', 'id')
+        .values_list('id', 'name', 'date', 'time', 'location', 'category__name', 'participant_count', 'capacity')
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    header = ['ID', 'Name', 'Date', 'Time', 'Location', 'Category', 'Participants', 'Capacity']
+    return export_response(stream_csv(header, rows), 'text/csv', 'events.csv')
+
+
+@login_required
+@user_passes_test(is_organizer_or_admin, login_url='no-permission')
+@read_from_replica
+def organizer_participants_csv(request):
+    rows = (
+        Participation.objects.filter(event__organizer_id=export_organizer(request))
+        .order_by('event__date', 'event_id', 'customuser__username')
+        .values_list('event_id', 'event__name', 'event__date', *ATTENDEE_FIELDS)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    header = ['Event ID', 'Event', 'Date', *ATTENDEE_HEADER]
+    return export_response(stream_csv(header, rows), 'text/csv', 'participants.csv')
+
+
+@login_required
+@user_passes_test(is_organizer_or_admin, login_url='no-permission')
+@read_from_replica
+def organizer_events_ics(request):
+    events = (
+        Event.objects.filter(organizer_id=export_organizer(request))
+        .order_by('date', 'id')
+        .values(*ICS_EVENT_FIELDS)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    body = (ics_event(request, event) + ics_line('END:VEVENT') for event in events)
+    return export_response(ics_calendar(body), 'text/calendar; charset=utf-8', 'events.ics')
@@ -6,7 +6,7 @@ from users.models import CustomUser
 class EventForm(StyledFormMixin, forms.ModelForm):
     class Meta:
         model = Event
-        fields = ['name', 'description', 'date', 'time', 'location', 'category', 'event_image']
+        fields = ['name', 'description', 'date', 'time', 'location', 'category', 'capacity', 'event_image']
         widgets = {
             'date': forms.DateInput(attrs={'type': 'date'}),
             'time': forms.TimeInput(attrs={'type': 'time'}),
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from core.tasks import enqueue
+from events.models import Event
+from events.renditions import build_renditions
+
+
+class Command(BaseCommand):
+    help = "Create thumbnail and WebP renditions for existing event images."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Rebuild even where renditions are up to date.")
+        parser.add_argument('--queue', action='store_true', help="Queue the work for run_tasks instead of doing it here.")
+
+    def handle(self, *args, **options):
+        events = Event.objects.exclude(event_image='').exclude(event_image__isnull=True).only('id', 'event_image', 'image_renditions')
+        built = skipped = 0
+        for event in events.iterator(chunk_size=500):
+            if event.renditions_ready and not options['all']:
+                continue
+            if options['queue']:
+                enqueue('build_event_renditions', event_id=event.pk)
+                built += 1
+            elif build_renditions(event):
+                built += 1
+            else:
+                skipped += 1
+                self.stderr.write(f"Skipped event {event.pk}: image '{event.event_image.name}' not found.")
+
+        action = "Queued" if options['queue'] else "Built"
+        self.stdout.write(self.style.SUCCESS(f"{action} renditions for {built} event(s), skipped {skipped}."))
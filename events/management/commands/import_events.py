@@ -0,0 +1,274 @@
+import csv
+import json
+from itertools import islice
+from pathlib import Path
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_time
+from core.tasks import enqueue_many
+from events.cache import bump_event_versions, bump_content_version, bump_month_versions
+from events.models import Event, Category, UserProfile
+from events.rollups import mark_events_dirty
+from events.search import update_search_vectors
+from events.signals import Participation, refresh_participant_counts
+from events.stats import invalidate_dashboard_stats
+
+
+User = get_user_model()
+
+MAX_REPORTED_SKIPS = 20
+
+
+def read_rows(path):
+    """Yield (line number, row dict) from a .csv file or a .jsonl/.ndjson file."""
+    path = Path(path)
+    if not path.exists():
+        raise CommandError(f"File not found: {path}")
+    suffix = path.suffix.lower()
+    if suffix == '.csv':
+        with path.open(newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+    elif suffix in ('.jsonl', '.ndjson'):
+        with path.open(encoding='utf-8') as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    raise CommandError(f"{path}:{line_no}: invalid JSON ({e})")
+                if not isinstance(row, dict):
+                    raise CommandError(f"{path}:{line_no}: expected a JSON object")
+                yield line_no, row
+    else:
+        raise CommandError(f"Unsupported file type '{suffix}' (expected .csv, .jsonl or .ndjson): {path}")
+
+
+def batches(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def chunks(values, size):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def text(row, key):
+    value = row.get(key)
+    return '' if value is None else str(value).strip()
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import categories, events and RSVPs from CSV or JSONL files.\n\n"
+        "categories: name, description, organizer (username)\n"
+        "events: ref, name, description, date, time, location, category (name), organizer (username), "
+        "capacity, image\n"
+        "rsvps: event_ref (a ref from --events) or event_id (an existing event), user (username)\n\n"
+        "Rows are written with bulk_create, so per-row signals do not fire; their net effect "
+        "(organizer roles, participant counts, search vectors, renditions, caches) is applied once "
+        "at the end. Imported RSVPs are historical: they are not checked against capacity and no "
+        "confirmation mail is sent."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', help="CSV/JSONL file of categories.")
+        parser.add_argument('--events', help="CSV/JSONL file of events.")
+        parser.add_argument('--rsvps', help="CSV/JSONL file of RSVPs.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if not any(options[kind] for kind in ('categories', 'events', 'rsvps')):
+            raise CommandError("Give at least one of --categories, --events or --rsvps.")
+
+        self.batch_size = options['batch_size']
+        self.skipped = 0
+        # Lookup caches: name/username/ref -> id, so each value is resolved once per run.
+        self.category_ids = dict(Category.objects.order_by('-id').values_list('name', 'id'))
+        self.user_ids = {}
+        self.event_refs = {}
+        self.known_event_ids = set()
+        self.new_event_ids = []
+        self.organizer_ids = set()
+        self.rsvp_event_ids = set()
+
+        with transaction.atomic():
+            if options['categories']:
+                self.report('categories', self.import_categories(options['categories']))
+            if options['events']:
+                self.report('events', self.import_events(options['events']))
+            if options['rsvps']:
+                self.report('RSVP rows (existing RSVPs are kept)', self.import_rsvps(options['rsvps']))
+            self.apply_signal_effects()
+        self.expire_caches()
+
+    def report(self, kind, created):
+        self.stdout.write(f"Imported {created} {kind}.")
+
+    def skip(self, path, line_no, reason):
+        self.skipped += 1
+        if self.skipped <= MAX_REPORTED_SKIPS:
+            where = f"{path}:{line_no}" if line_no else path
+            self.stderr.write(f"Skipped {where}: {reason}")
+        elif self.skipped == MAX_REPORTED_SKIPS + 1:
+            self.stderr.write("Further skipped rows are only counted.")
+
+    # Lookups
+    def resolve_users(self, usernames):
+        missing = {name for name in usernames if name and name not in self.user_ids}
+        for names in chunks(missing, self.batch_size):
+            self.user_ids.update(User.objects.filter(username__in=names).values_list('username', 'id'))
+        # Remember misses too so unknown names are not queried again.
+        self.user_ids.update({name: None for name in missing if name not in self.user_ids})
+
+    def resolve_event_ids(self, ids):
+        missing = {event_id for event_id in ids if event_id not in self.known_event_ids}
+        if missing:
+            self.known_event_ids.update(Event.objects.filter(pk__in=missing).values_list('id', flat=True))
+
+    def create_categories(self, categories):
+        created = Category.objects.bulk_create(categories, batch_size=self.batch_size)
+        self.category_ids.update({category.name: category.pk for category in created})
+        return len(created)
+
+    # Importers
+    def import_categories(self, path):
+        created = 0
+        for batch in batches(read_rows(path), self.batch_size):
+            self.resolve_users(text(row, 'organizer') for _, row in batch)
+            categories = {}
+            for line_no, row in batch:
+                name = text(row, 'name')
+                if not name:
+                    self.skip(path, line_no, "category has no name")
+                elif name not in self.category_ids and name not in categories:
+                    categories[name] = Category(
+                        name=name, description=text(row, 'description'),
+                        organizer_id=self.user_ids.get(text(row, 'organizer')),
+                    )
+            created += self.create_categories(categories.values())
+        return created
+
+    def import_events(self, path):
+        created = 0
+        for batch in batches(read_rows(path), self.batch_size):
+            self.resolve_users(text(row, 'organizer') for _, row in batch)
+            self.create_categories([
+                Category(name=name, description='')
+                for name in {text(row, 'category') for _, row in batch} - self.category_ids.keys() if name
+            ])
+
+            events, refs = [], []
+            for line_no, row in batch:
+                try:
+                    event = self.build_event(row)
+                except (ValueError, TypeError) as e:
+                    self.skip(path, line_no, e)
+                    continue
+                events.append(event)
+                refs.append(text(row, 'ref'))
+
+            Event.objects.bulk_create(events, batch_size=self.batch_size)
+            for ref, event in zip(refs, events):
+                if ref:
+                    self.event_refs[ref] = event.pk
+                self.new_event_ids.append(event.pk)
+                self.organizer_ids.add(event.organizer_id)
+            created += len(events)
+        return created
+
+    def build_event(self, row):
+        organizer_id = self.user_ids.get(text(row, 'organizer'))
+        if organizer_id is None:
+            raise ValueError(f"unknown organizer '{text(row, 'organizer')}'")
+        category_id = self.category_ids.get(text(row, 'category'))
+        if category_id is None:
+            raise ValueError("event has no category")
+        event_date, event_time = parse_date(text(row, 'date')), parse_time(text(row, 'time'))
+        if event_date is None or event_time is None:
+            raise ValueError(f"bad date/time '{text(row, 'date')} {text(row, 'time')}'")
+        if not text(row, 'name'):
+            raise ValueError("event has no name")
+
+        event = Event(
+            name=text(row, 'name'), description=text(row, 'description'), date=event_date, time=event_time,
+            location=text(row, 'location'), category_id=category_id, organizer_id=organizer_id,
+            capacity=int(text(row, 'capacity')) if text(row, 'capacity') else None,
+        )
+        if event.capacity is not None and event.capacity < 0:
+            raise ValueError("capacity cannot be negative")
+        if text(row, 'image'):
+            event.event_image = text(row, 'image')
+        return event
+
+    def import_rsvps(self, path):
+        created = 0
+        for batch in batches(read_rows(path), self.batch_size):
+            self.resolve_users(text(row, 'user') for _, row in batch)
+            self.resolve_event_ids(
+                int(text(row, 'event_id')) for _, row in batch if text(row, 'event_id').isdigit()
+            )
+
+            rsvps = []
+            for line_no, row in batch:
+                user_id = self.user_ids.get(text(row, 'user'))
+                if text(row, 'event_ref'):
+                    event_id = self.event_refs.get(text(row, 'event_ref'))
+                elif text(row, 'event_id').isdigit() and int(text(row, 'event_id')) in self.known_event_ids:
+                    event_id = int(text(row, 'event_id'))
+                else:
+                    event_id = None
+                if user_id is None or event_id is None:
+                    self.skip(path, line_no, f"unknown user or event in {row}")
+                    continue
+                rsvps.append(Participation(event_id=event_id, customuser_id=user_id))
+                self.rsvp_event_ids.add(event_id)
+
+            # Existing RSVPs are left alone, so re-running an import is harmless.
+            Participation.objects.bulk_create(rsvps, batch_size=self.batch_size, ignore_conflicts=True)
+            created += len(rsvps)
+        return created
+
+    # Net effect of the signals bulk_create skipped
+    def apply_signal_effects(self):
+        # users.signals.update_user_role: an organizer's participant profile becomes 'organizer'.
+        for ids in chunks(self.organizer_ids, self.batch_size):
+            UserProfile.objects.bulk_create(
+                [UserProfile(user_id=user_id, role='organizer') for user_id in ids], ignore_conflicts=True,
+            )
+            UserProfile.objects.filter(user_id__in=ids, role='participant').update(role='organizer')
+
+        # events.signals.update_participant_count
+        now = timezone.now()
+        for ids in chunks(self.rsvp_event_ids, self.batch_size):
+            refresh_participant_counts(ids, updated_at=now)
+
+        # events.signals.refresh_event_search_vector and queue_image_renditions
+        for ids in chunks(self.new_event_ids, self.batch_size):
+            update_search_vectors(Event.objects.filter(pk__in=ids))
+            with_image = Event.objects.filter(pk__in=ids).exclude(event_image='').exclude(event_image__isnull=True)
+            enqueue_many('build_event_renditions', [
+                {'event_id': event_id} for event_id in with_image.values_list('id', flat=True)
+            ])
+
+        # events.signals.mark_rollup_day_on_save and mark_rollup_days_on_rsvp_change
+        for ids in chunks(set(self.new_event_ids) | self.rsvp_event_ids, self.batch_size):
+            mark_events_dirty(ids)
+
+        if self.skipped:
+            self.stderr.write(f"Skipped {self.skipped} row(s) in total.")
+
+    def expire_caches(self):
+        invalidate_dashboard_stats()
+        for ids in chunks(self.new_event_ids, self.batch_size):
+            bump_month_versions(Event.objects.filter(pk__in=ids).dates('date', 'month'))
+        bump_event_versions(self.rsvp_event_ids)
+        bump_content_version()
+        self.stdout.write(self.style.SUCCESS("Import finished."))
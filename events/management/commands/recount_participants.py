@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from events.signals import refresh_participant_counts
+
+
+class Command(BaseCommand):
+    help = "Repair Event.participant_count from the RSVP table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', type=int, help="Only recount these events.")
+
+    def handle(self, *args, **options):
+        event_ids = options['event_ids'] or None
+        with transaction.atomic():
+            updated = refresh_participant_counts(event_ids)
+        self.stdout.write(self.style.SUCCESS(f"Recounted participants for {updated} event(s)."))
@@ -0,0 +1,26 @@
+import time
+from django.core.management.base import BaseCommand
+from events.rollups import REFRESH_BATCH_DAYS, mark_all_dirty, refresh_rollups
+from events.stats import invalidate_dashboard_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily event/RSVP rollup for days whose events or RSVPs changed since the "
+        "last run. Run it often (every few minutes); use --full once to build the rollup from scratch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Rebuild every day, not only the changed ones.")
+        parser.add_argument('--batch-days', type=int, default=REFRESH_BATCH_DAYS, help="Days per transaction.")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        if options['full']:
+            mark_all_dirty()
+        days = refresh_rollups(batch_days=options['batch_days'])
+        if days:
+            invalidate_dashboard_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {days} day(s) in {time.perf_counter() - start:.2f}s."
+        ))
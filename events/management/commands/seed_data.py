@@ -0,0 +1,135 @@
+import random
+from datetime import time, timedelta
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from events.cache import bump_content_version, bump_month_versions
+from events.models import Event, Category, UserProfile
+from events.rollups import mark_events_dirty
+from events.search import update_search_vectors
+from events.signals import Participation, refresh_participant_counts
+from events.stats import invalidate_dashboard_stats
+
+
+User = get_user_model()
+
+ROLES = ('Admin', 'Organizer', 'Participant')
+LOCATIONS = ('Dhaka', 'Chattogram', 'Khulna', 'Rajshahi', 'Sylhet', 'Barishal', 'Rangpur', 'Mymensingh')
+WORDS = ('Tech', 'Music', 'Food', 'Art', 'Startup', 'Health', 'Science', 'Sports', 'Book', 'Film')
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic users, categories, events and RSVPs for local "
+        "benchmarking, e.g. --events 10000 --rsvps 1000000. Every seeded user's password "
+        "is --password."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--organizers', type=int, default=50, help="How many of the users are organizers.")
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--events', type=int, default=1000)
+        parser.add_argument('--rsvps', type=int, default=20000)
+        parser.add_argument('--password', default='benchmark')
+        parser.add_argument('--prefix', default='seed', help="Username prefix, so runs can be told apart.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed, for repeatable data.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options['events'] and not (options['organizers'] and options['categories']):
+            raise CommandError("Events need at least one organizer and one category.")
+        if options['organizers'] >= options['users']:
+            raise CommandError("--organizers must be smaller than --users.")
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        with transaction.atomic():
+            user_ids, organizer_ids = self.seed_users(options)
+            category_ids = self.seed_categories(options['categories'], options['prefix'])
+            seats = -(-options['rsvps'] // max(options['events'], 1))
+            event_ids = self.seed_events(options['events'], category_ids, organizer_ids, seats)
+            rsvps = self.seed_rsvps(options['rsvps'], event_ids, user_ids)
+            refresh_participant_counts(event_ids)
+            update_search_vectors(Event.objects.filter(pk__in=event_ids))
+            mark_events_dirty(event_ids)
+        invalidate_dashboard_stats()
+        bump_content_version()
+        bump_month_versions(Event.objects.dates('date', 'month'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(user_ids)} users ({len(organizer_ids)} organizers), {len(category_ids)} categories, "
+            f"{len(event_ids)} events and {rsvps} RSVPs."
+        ))
+
+    def bulk_create(self, model, objects):
+        return model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def seed_users(self, options):
+        groups = {name: Group.objects.get_or_create(name=name)[0] for name in ROLES}
+        # Hashing is slow on purpose, so every seeded user shares one hash.
+        password = make_password(options['password'])
+        prefix = options['prefix']
+        start = User.objects.filter(username__startswith=prefix).count()
+
+        users = self.bulk_create(User, [
+            User(
+                username=f'{prefix}{n}', email=f'{prefix}{n}@example.com', password=password,
+                first_name=self.rng.choice(WORDS), last_name=f'User{n}', is_active=True,
+            )
+            for n in range(start, start + options['users'])
+        ])
+        user_ids = [user.pk for user in users]
+        organizer_ids = user_ids[:options['organizers']]
+        organizer_set = set(organizer_ids)
+        admin_ids = set(user_ids[options['organizers']:options['organizers'] + 1])
+
+        def role(user_id):
+            return 'Organizer' if user_id in organizer_set else 'Admin' if user_id in admin_ids else 'Participant'
+
+        Membership = User.groups.through
+        self.bulk_create(Membership, [Membership(customuser_id=user_id, group=groups[role(user_id)]) for user_id in user_ids])
+        self.bulk_create(UserProfile, [UserProfile(user_id=user_id, role=role(user_id).lower()) for user_id in user_ids])
+        return user_ids, organizer_ids
+
+    def seed_categories(self, count, prefix):
+        categories = self.bulk_create(Category, [
+            Category(name=f'{self.rng.choice(WORDS)} {prefix} {n}', description='Seeded category') for n in range(count)
+        ])
+        return [category.pk for category in categories]
+
+    def seed_events(self, count, category_ids, organizer_ids, seats):
+        today = timezone.localdate()
+        events = []
+        for n in range(count):
+            word = self.rng.choice(WORDS)
+            events.append(Event(
+                name=f'{word} Event {n}',
+                description=f'A seeded {word.lower()} event for benchmarking.',
+                date=today + timedelta(days=self.rng.randint(-180, 180)),
+                time=time(self.rng.randint(8, 21), self.rng.choice((0, 30))),
+                location=self.rng.choice(LOCATIONS),
+                category_id=self.rng.choice(category_ids),
+                organizer_id=self.rng.choice(organizer_ids),
+                # Some events end up exactly full, some have room, most are unlimited.
+                capacity=self.rng.choice((None, None, seats, seats * 2)),
+            ))
+        return [event.pk for event in self.bulk_create(Event, events)]
+
+    def seed_rsvps(self, count, event_ids, user_ids):
+        """Spread count RSVPs over the events, each user at most once per event."""
+        if not event_ids or not user_ids:
+            return 0
+        per_event, extra = divmod(min(count, len(event_ids) * len(user_ids)), len(event_ids))
+        created = 0
+        batch = []
+        for index, event_id in enumerate(event_ids):
+            attendees = self.rng.sample(user_ids, per_event + (1 if index < extra else 0))
+            batch.extend(Participation(event_id=event_id, customuser_id=user_id) for user_id in attendees)
+            if len(batch) >= self.batch_size:
+                created += len(self.bulk_create(Participation, batch))
+                batch = []
+        created += len(self.bulk_create(Participation, batch))
+        return created
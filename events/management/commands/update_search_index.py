@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from events.models import Event
+from events.search import update_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search vectors for events (PostgreSQL only)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing', action='store_true', help="Only fill events that have no vector yet.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        events = Event.objects.all()
+        if options['missing']:
+            events = events.filter(search_vector__isnull=True)
+
+        ids = list(events.order_by('id').values_list('id', flat=True))
+        updated = 0
+        for start in range(0, len(ids), options['batch_size']):
+            updated += update_search_vectors(Event.objects.filter(pk__in=ids[start:start + options['batch_size']]))
+        self.stdout.write(self.style.SUCCESS(f"Updated search vectors for {updated} event(s)."))
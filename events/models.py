@@ -1,5 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
+from django.utils import timezone
 
 
 User = settings.AUTH_USER_MODEL
@@ -19,11 +21,12 @@ class UserProfile(models.Model):
     
 
 class Category(models.Model):
-    name = models.CharField(max_length=100)
+    name = models.CharField(max_length=100, db_index=True)
     description = models.TextField()
     organizer = models.ForeignKey(
         User, on_delete=models.SET_NULL, null=True, blank=True, related_name="organized_categories"
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -37,21 +40,154 @@ class Event(models.Model):
     location = models.CharField(max_length=255)
     category = models.ForeignKey(Category, related_name='events', on_delete=models.CASCADE)
     event_image = models.ImageField(upload_to='event_images/', blank=True, null=True, default='event_images/default.jpg')
+    # Paths of resized copies of event_image, filled in by events.renditions.
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
 
     def get_event_image(self):
         if self.event_image:
             return self.event_image.url
         return f'{settings.MEDIA_URL}event_images/default.jpg'
 
+    @property
+    def renditions_ready(self):
+        return bool(self.event_image) and self.image_renditions.get('source') == self.event_image.name
+
+    def get_image_rendition(self, size='thumb', fmt='jpeg'):
+        """URL of a resized copy, or the original image until renditions are built."""
+        if self.renditions_ready and size in self.image_renditions.get(fmt, {}):
+            return self.event_image.storage.url(self.image_renditions[fmt][size])
+        return self.get_event_image()
+
+    def get_image_srcset(self, fmt='jpeg'):
+        """'<url> 400w, <url> 800w' for use in srcset; empty until renditions are built."""
+        if not self.renditions_ready:
+            return ''
+        widths = self.image_renditions.get('widths', {})
+        return ', '.join(
+            f"{self.event_image.storage.url(path)} {widths[size]}w"
+            for size, path in self.image_renditions.get(fmt, {}).items() if size in widths
+        )
+
+    @property
+    def thumbnail_url(self):
+        return self.get_image_rendition('thumb')
+
+    @property
+    def image_srcset(self):
+        return self.get_image_srcset('jpeg')
+
+    @property
+    def image_srcset_webp(self):
+        return self.get_image_srcset('webp')
+
     organizer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='organized_events')
     participants = models.ManyToManyField(User, related_name='rsvp_events', blank=True)
+    participant_count = models.PositiveIntegerField(default=0, editable=False)
+    capacity = models.PositiveIntegerField(null=True, blank=True, help_text="Leave empty for unlimited seats.")
+    search_vector = SearchVectorField(null=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination and the date filters on every list/dashboard.
+            models.Index(fields=['date', 'id'], name='event_date_id_idx'),
+            models.Index(fields=['category', 'date'], name='event_category_date_idx'),
+            models.Index(fields=['organizer', 'date'], name='event_organizer_date_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def is_full(self):
+        return self.capacity is not None and self.participant_count >= self.capacity
+
+    RSVP_ADDED = 'added'
+    RSVP_REMOVED = 'removed'
+    RSVP_FULL = 'full'
+
+    def _lock(self):
+        """Re-read the event under a row lock so concurrent RSVPs queue up behind each other."""
+        # The RSVP signals read date (events.rollups marks the day dirty) and name
+        # (users.signals.send_rsvp_confirmation); deferring either costs a query.
+        return (
+            Event.objects.select_for_update()
+            .only('name', 'capacity', 'participant_count', 'date')
+            .get(pk=self.pk)
+        )
+
     def add_rsvp(self, user):
-        """A user cannot RSVP twice."""
-        if not self.participants.filter(id=user.id).exists():
-            self.participants.add(user)
-            return True
-        return False
+        """A user cannot RSVP twice, and never once the event is full."""
+        with transaction.atomic():
+            event = self._lock()
+            added = not event.is_full and not event.participants.filter(id=user.id).exists()
+            if added:
+                event.participants.add(user)
+                event.participant_count += 1
+        self.participant_count = event.participant_count
+        return added
+
+    def cancel_rsvp(self, user):
+        with transaction.atomic():
+            event = self._lock()
+            removed = event.participants.filter(id=user.id).exists()
+            if removed:
+                event.participants.remove(user)
+                event.participant_count -= 1
+        self.participant_count = event.participant_count
+        return removed
+
+    def toggle_rsvp(self, user):
+        """
+        Cancel the user's RSVP if they have one, otherwise add it if a seat
+        is left, all under one row lock so double clicks queue up. Returns
+        RSVP_REMOVED, RSVP_ADDED or RSVP_FULL.
+        """
+        with transaction.atomic():
+            event = self._lock()
+            if event.participants.filter(id=user.id).exists():
+                event.participants.remove(user)
+                event.participant_count -= 1
+                result = self.RSVP_REMOVED
+            elif event.is_full:
+                result = self.RSVP_FULL
+            else:
+                event.participants.add(user)
+                event.participant_count += 1
+                result = self.RSVP_ADDED
+        self.participant_count = event.participant_count
+        return result
+
+
+class DailyEventRollup(models.Model):
+    """
+    Events and RSVPs per event day, category and organizer, kept up to date
+    by the refresh_rollups command (see events.rollups).
+    """
+    day = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='+')
+    organizer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    events = models.PositiveIntegerField(default=0)
+    rsvps = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'category', 'organizer'], name='rollup_day_category_organizer'),
+        ]
+        indexes = [
+            models.Index(fields=['organizer', 'day'], name='rollup_organizer_day_idx'),
+            models.Index(fields=['category', 'day'], name='rollup_category_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: {self.events} events, {self.rsvps} RSVPs"
+
+
+class RollupDirtyDay(models.Model):
+    """An event day whose DailyEventRollup rows are out of date."""
+    day = models.DateField(unique=True)
+    # Refreshed each time the day is marked, so a refresh only clears marks it has covered.
+    marked_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return str(self.day)
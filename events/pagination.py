@@ -0,0 +1,145 @@
+import base64
+import json
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+EVENT_ORDERING = ('date', 'id')
+EVENTS_PER_PAGE = 12
+USERS_PER_PAGE = 25
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, prev_cursor=None, next_url=None, prev_url=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.next_url = next_url
+        self.prev_url = prev_url
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over a unique ordering such as ('date', 'id').
+
+    Pages are fetched with a WHERE on the last seen key instead of OFFSET,
+    so every page costs the same no matter how deep it is.
+    """
+
+    def __init__(self, queryset, ordering, per_page=20):
+        self.queryset = queryset
+        self.ordering = ordering
+        self.per_page = per_page
+        self.fields = [name.lstrip('-') for name in ordering]
+
+    def encode_cursor(self, obj, direction):
+        values = []
+        for name in self.fields:
+            value = obj[name] if isinstance(obj, dict) else getattr(obj, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        payload = json.dumps({'d': direction, 'v': values}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction, raw_values = payload['d'], payload['v']
+            if direction not in ('n', 'p') or len(raw_values) != len(self.fields):
+                return None
+            values = [self._to_python(name, value) for name, value in zip(self.fields, raw_values)]
+        except (ValueError, TypeError, KeyError, ValidationError):
+            return None
+        return direction, values
+
+    def _to_python(self, name, value):
+        try:
+            field = self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # An annotation such as a search score; JSON already kept its type.
+            return value
+        return field.to_python(value)
+
+    def _seek(self, values, forward):
+        """Build the (a, b, ...) > (va, vb, ...) condition for mixed directions."""
+        condition = Q()
+        equal = Q()
+        for ordering, name, value in zip(self.ordering, self.fields, values):
+            descending = ordering.startswith('-')
+            lookup = 'lt' if descending == forward else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _query(self, cursor):
+        """The queryset for one page (plus one row to detect more) and the cursor direction."""
+        decoded = self.decode_cursor(cursor) if cursor else None
+        if decoded is None:
+            return self.queryset.order_by(*self.ordering)[:self.per_page + 1], None
+        direction, values = decoded
+        if direction == 'n':
+            return self.queryset.filter(self._seek(values, True)).order_by(*self.ordering)[:self.per_page + 1], 'n'
+        reverse = [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+        return self.queryset.filter(self._seek(values, False)).order_by(*reverse)[:self.per_page + 1], 'p'
+
+    def _page(self, rows, direction):
+        if direction is None:
+            has_next, has_prev = len(rows) > self.per_page, False
+            rows = rows[:self.per_page]
+        elif direction == 'n':
+            has_next, has_prev = len(rows) > self.per_page, True
+            rows = rows[:self.per_page]
+        else:
+            has_next, has_prev = True, len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+
+        next_cursor = self.encode_cursor(rows[-1], 'n') if rows and has_next else None
+        prev_cursor = self.encode_cursor(rows[0], 'p') if rows and has_prev else None
+        return KeysetPage(rows, next_cursor, prev_cursor)
+
+    def page(self, cursor=None):
+        queryset, direction = self._query(cursor)
+        return self._page(list(queryset), direction)
+
+    async def apage(self, cursor=None):
+        queryset, direction = self._query(cursor)
+        return self._page([row async for row in queryset], direction)
+
+
+def _link_pages(request, page, param):
+    def url_for(cursor):
+        params = request.GET.copy()
+        params[param] = cursor
+        return f"?{params.urlencode()}"
+
+    if page.next_cursor:
+        page.next_url = url_for(page.next_cursor)
+    if page.prev_cursor:
+        page.prev_url = url_for(page.prev_cursor)
+    return page
+
+
+def paginate(request, queryset, ordering, per_page=20, param='cursor'):
+    """Return a KeysetPage for the request with next/prev URLs that keep the other GET params."""
+    page = KeysetPaginator(queryset, ordering, per_page).page(request.GET.get(param))
+    return _link_pages(request, page, param)
+
+
+async def apaginate(request, queryset, ordering, per_page=20, param='cursor'):
+    """paginate() for async views."""
+    page = await KeysetPaginator(queryset, ordering, per_page).apage(request.GET.get(param))
+    return _link_pages(request, page, param)
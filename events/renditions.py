@@ -0,0 +1,93 @@
+import hashlib
+from io import BytesIO
+from pathlib import PurePosixPath
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+from core.tasks import task
+from events.cache import bump_content_version, bump_event_versions
+from events.models import Event
+
+
+# name -> (width, height); cards and dashboard rows use these instead of the original upload.
+RENDITION_SIZES = {
+    'thumb': (400, 240),
+    'card': (800, 480),
+}
+RENDITION_FORMATS = {
+    'jpeg': ('jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'webp': ('webp', {'quality': 80, 'method': 4}),
+}
+RENDITION_DIR = 'event_images/renditions'
+
+
+def rendition_path(source_name, size, fmt):
+    # Keyed on the full source name: poster.jpg and poster.png, or the same
+    # file name in two folders, must not share renditions.
+    digest = hashlib.sha1(source_name.encode()).hexdigest()[:16]
+    stem = PurePosixPath(source_name).stem
+    extension = RENDITION_FORMATS[fmt][0]
+    return f'{RENDITION_DIR}/{digest}/{stem}_{size}.{extension}'
+
+
+def render_image(source, size, fmt):
+    image = source.copy()
+    image = ImageOps.fit(image, RENDITION_SIZES[size], Image.LANCZOS)
+    if fmt == 'jpeg' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, format=fmt.upper(), **RENDITION_FORMATS[fmt][1])
+    return buffer.getvalue()
+
+
+def record_renditions(event, renditions):
+    # update() so recording the result does not fire post_save and re-queue the
+    # job; the cache versions post_save would have bumped are bumped here instead.
+    Event.objects.filter(pk=event.pk).update(image_renditions=renditions)
+    event.image_renditions = renditions
+    bump_event_versions([event.pk])
+    bump_content_version()
+
+
+def build_renditions(event):
+    """
+    Write every size/format of the event's image to storage and record
+    their paths on the event. Returns False if there is no source file.
+
+    Renditions already in storage are reused, never rewritten: events that
+    share a source (such as the default image) share its renditions.
+    """
+    source_name = event.event_image.name if event.event_image else ''
+    if not source_name or not default_storage.exists(source_name):
+        # Remember the miss so saves don't keep queueing it; pages fall back to the original.
+        record_renditions(event, {'source': source_name})
+        return False
+
+    source = None
+    renditions = {'source': source_name, 'widths': {size: dims[0] for size, dims in RENDITION_SIZES.items()}}
+    for fmt in RENDITION_FORMATS:
+        renditions[fmt] = {}
+        for size in RENDITION_SIZES:
+            path = rendition_path(source_name, size, fmt)
+            if not default_storage.exists(path):
+                if source is None:
+                    source = _open_source(source_name)
+                path = default_storage.save(path, ContentFile(render_image(source, size, fmt)))
+            renditions[fmt][size] = path
+
+    record_renditions(event, renditions)
+    return True
+
+
+def _open_source(source_name):
+    with default_storage.open(source_name, 'rb') as source_file:
+        source = ImageOps.exif_transpose(Image.open(source_file))
+        source.load()
+    return source
+
+
+@task('build_event_renditions')
+def build_event_renditions(event_id):
+    event = Event.objects.filter(pk=event_id).only('id', 'event_image', 'image_renditions').first()
+    if event is not None:
+        build_renditions(event)
@@ -0,0 +1,96 @@
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from events.models import Event, DailyEventRollup, RollupDirtyDay
+
+
+# Daily rollups: DailyEventRollup holds per-day, per-category, per-organizer
+# event and RSVP counts. Changes to events and RSVPs only mark their day dirty
+# (events.signals); refresh_rollups recomputes the dirty days from Event rows,
+# whose participant_count already holds each event's RSVPs. Readers add the
+# live counts of dirty days to the rollup of the clean ones, so totals are
+# exact between refreshes.
+#
+# Marking a day that is already dirty updates its marked_at, which locks the
+# row, so a refresh claiming it waits for the change to commit. A refresh
+# deletes the dirty rows only after recomputing, and only those not marked
+# again since it claimed them.
+
+REFRESH_BATCH_DAYS = 366
+
+
+def mark_dirty_days(days):
+    days = set(days)
+    if days:
+        now = timezone.now()
+        RollupDirtyDay.objects.bulk_create(
+            [RollupDirtyDay(day=day, marked_at=now) for day in days],
+            update_conflicts=True, unique_fields=['day'], update_fields=['marked_at'],
+        )
+
+
+def mark_events_dirty(event_ids):
+    mark_dirty_days(Event.objects.filter(pk__in=event_ids).values_list('date', flat=True).distinct())
+
+
+def mark_all_dirty():
+    """Every day that has events or rollup rows, for a full rebuild."""
+    mark_dirty_days(Event.objects.order_by().values_list('date', flat=True).distinct())
+    mark_dirty_days(DailyEventRollup.objects.order_by().values_list('day', flat=True).distinct())
+
+
+def _refresh_batch(limit):
+    with transaction.atomic():
+        claimed_at = timezone.now()
+        claimed = list(RollupDirtyDay.objects.select_for_update().order_by('day')[:limit])
+        if not claimed:
+            return 0
+        days = [dirty.day for dirty in claimed]
+
+        rows = (
+            Event.objects.filter(date__in=days)
+            .order_by()
+            .values('date', 'category_id', 'organizer_id')
+            .annotate(events=Count('id'), rsvps=Coalesce(Sum('participant_count'), 0))
+        )
+        DailyEventRollup.objects.filter(day__in=days).delete()
+        DailyEventRollup.objects.bulk_create([
+            DailyEventRollup(
+                day=row['date'], category_id=row['category_id'], organizer_id=row['organizer_id'],
+                events=row['events'], rsvps=row['rsvps'],
+            )
+            for row in rows
+        ])
+        # A day marked after the claim may hold a change the counts above missed.
+        RollupDirtyDay.objects.filter(day__in=days, marked_at__lte=claimed_at).delete()
+    return len(days)
+
+
+def refresh_rollups(batch_days=REFRESH_BATCH_DAYS):
+    """Recompute the rollup rows of every dirty day, a batch of days per transaction."""
+    done = 0
+    while refreshed := _refresh_batch(batch_days):
+        done += refreshed
+    return done
+
+
+def event_totals(today, **filters):
+    """
+    Total, upcoming, past and today's event counts, optionally for one
+    category or organizer (category_id=..., organizer_id=...).
+    """
+    dirty_days = RollupDirtyDay.objects.values('day')
+    clean = DailyEventRollup.objects.filter(**filters).exclude(day__in=dirty_days).aggregate(
+        total_events=Coalesce(Sum('events'), 0),
+        total_upcoming_events=Coalesce(Sum('events', filter=Q(day__gte=today)), 0),
+        total_past_events=Coalesce(Sum('events', filter=Q(day__lt=today)), 0),
+        total_today_events=Coalesce(Sum('events', filter=Q(day=today)), 0),
+    )
+    live = Event.objects.filter(date__in=dirty_days, **filters).aggregate(
+        total_events=Count('id'),
+        total_upcoming_events=Count('id', filter=Q(date__gte=today)),
+        total_past_events=Count('id', filter=Q(date__lt=today)),
+        total_today_events=Count('id', filter=Q(date=today)),
+    )
+    return {key: clean[key] + live[key] for key in clean}
@@ -0,0 +1,64 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import connections, router
+from django.db.models import F, FloatField, OuterRef, Q, Subquery
+from django.db.models.functions import Cast, Coalesce
+from core.db import run_postgres_ddl
+from events.models import Event, Category
+from events.pagination import EVENT_ORDERING
+
+
+SEARCH_CONFIG = 'simple'
+
+SEARCH_INDEX_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS events_event_search_vector_gin ON events_event USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS events_event_name_trgm_gin ON events_event USING gin (name gin_trgm_ops)",
+]
+
+
+def _is_postgres(model=Event):
+    return connections[router.db_for_read(model)].vendor == 'postgresql'
+
+
+def update_search_vectors(events):
+    """Rebuild search_vector for the given Event queryset with a single UPDATE."""
+    if not _is_postgres():
+        return 0
+    category_name = Subquery(Category.objects.filter(pk=OuterRef('category_id')).values('name')[:1])
+    return events.update(search_vector=(
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(category_name, weight='B', config=SEARCH_CONFIG)
+        + SearchVector('location', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+    ))
+
+
+def search_events(events, query):
+    """
+    Filter an Event queryset by a search string.
+
+    Returns the queryset and the keyset ordering to page it with. On
+    PostgreSQL results are ranked by full-text match plus name trigram
+    similarity, so typos still find the event; elsewhere it falls back to
+    plain substring matching in date order.
+    """
+    if not query:
+        return events, EVENT_ORDERING
+
+    if not _is_postgres():
+        return events.filter(
+            Q(name__icontains=query) | Q(location__icontains=query)
+            | Q(description__icontains=query) | Q(category__name__icontains=query)
+        ), EVENT_ORDERING
+
+    search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+    events = events.annotate(
+        # float8 so the score survives a round trip through the page cursor.
+        search_score=Coalesce(Cast(SearchRank(F('search_vector'), search_query), FloatField()), 0.0)
+        + Cast(TrigramSimilarity('name', query), FloatField()),
+    ).filter(Q(search_vector=search_query) | Q(name__trigram_similar=query))
+    return events, ('-search_score', 'id')
+
+
+def create_search_indexes(sender, using, **kwargs):
+    run_postgres_ddl(using, SEARCH_INDEX_DDL)
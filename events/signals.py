@@ -0,0 +1,188 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, pre_save, post_save, post_delete
+from django.conf import settings
+from django.dispatch import receiver
+from django.utils import timezone
+from events.models import Event, Category
+from events.search import update_search_vectors
+import events.renditions  # registers the build_event_renditions task
+from core.tasks import enqueue
+from events.stats import invalidate_dashboard_stats
+from events.rollups import mark_dirty_days, mark_events_dirty
+from events.cache import bump_event_versions, bump_content_version, bump_month_versions, expire_calendar_title
+
+
+Participation = Event.participants.through
+RSVP_CHANGES = ('post_add', 'post_remove', 'post_clear')
+
+
+def refresh_participant_counts(event_ids=None, **extra):
+    """Recount stored participant_count from the through table in one UPDATE."""
+    counts = (
+        Participation.objects.filter(event_id=OuterRef('pk'))
+        .order_by()
+        .values('event_id')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    events = Event.objects.all()
+    if event_ids is not None:
+        events = events.filter(pk__in=event_ids)
+    return events.update(participant_count=Coalesce(Subquery(counts), 0), **extra)
+
+
+def changed_event_ids(instance, action, reverse, pk_set):
+    """Events touched by an RSVP m2m_changed signal, whichever side it came from."""
+    if not reverse:
+        return [instance.pk]
+    if action == 'post_clear':
+        return getattr(instance, '_cleared_event_ids', [])
+    return list(pk_set or [])
+
+
+@receiver(m2m_changed, sender=Participation)
+def update_participant_count(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # The affected events are gone from the through table after the clear.
+        instance._cleared_event_ids = list(instance.rsvp_events.values_list('id', flat=True))
+        return
+
+    # An RSVP change is a change to the event page, so it moves updated_at too.
+    now = timezone.now()
+    if action == 'post_add' and pk_set:
+        # Django only reports ids that were actually inserted, so we can increment.
+        if reverse:
+            Event.objects.filter(pk__in=pk_set).update(participant_count=F('participant_count') + 1, updated_at=now)
+        else:
+            Event.objects.filter(pk=instance.pk).update(participant_count=F('participant_count') + len(pk_set), updated_at=now)
+    elif action == 'post_remove' and pk_set:
+        # pk_set holds the requested ids, not the deleted ones, so recount.
+        refresh_participant_counts(pk_set if reverse else [instance.pk], updated_at=now)
+    elif action == 'post_clear':
+        if reverse:
+            refresh_participant_counts(getattr(instance, '_cleared_event_ids', []), updated_at=now)
+        else:
+            Event.objects.filter(pk=instance.pk).update(participant_count=0, updated_at=now)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_stats_on_event_change(sender, **kwargs):
+    invalidate_dashboard_stats()
+
+
+@receiver(m2m_changed, sender=Participation)
+def invalidate_stats_on_rsvp_change(sender, action, **kwargs):
+    if action in RSVP_CHANGES:
+        invalidate_dashboard_stats()
+
+
+@receiver(post_save, sender=Event)
+def refresh_event_search_vector(sender, instance, **kwargs):
+    update_search_vectors(Event.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Category)
+def refresh_category_search_vectors(sender, instance, created, **kwargs):
+    if not created:
+        update_search_vectors(Event.objects.filter(category=instance))
+
+
+@receiver(post_save, sender=Event)
+def queue_image_renditions(sender, instance, **kwargs):
+    if instance.event_image and not instance.renditions_ready:
+        enqueue('build_event_renditions', event_id=instance.pk)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def expire_event_fragments(sender, instance, **kwargs):
+    bump_event_versions([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def expire_category_event_fragments(sender, instance, **kwargs):
+    # After a delete the cascade has already removed (and expired) the events.
+    bump_event_versions(list(Event.objects.filter(category_id=instance.pk).values_list('id', flat=True)))
+
+
+@receiver(m2m_changed, sender=Participation)
+def expire_rsvp_event_fragments(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in RSVP_CHANGES:
+        bump_event_versions(changed_event_ids(instance, action, reverse, pk_set))
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def expire_anonymous_pages(sender, **kwargs):
+    bump_content_version()
+
+
+@receiver(m2m_changed, sender=Participation)
+def expire_anonymous_pages_on_rsvp(sender, action, **kwargs):
+    if action in RSVP_CHANGES:
+        bump_content_version()
+
+
+def event_days(instance):
+    """The event's date, plus the one it had before this save if it moved."""
+    return {instance.date, getattr(instance, '_previous_date', None)} - {None}
+
+
+@receiver(pre_save, sender=Event)
+def remember_previous_date(sender, instance, **kwargs):
+    # Moving an event to another date changes the rollup and calendar of both days.
+    instance._previous_date = None
+    if instance.pk:
+        instance._previous_date = Event.objects.filter(pk=instance.pk).values_list('date', flat=True).first()
+
+
+@receiver(post_save, sender=Event)
+def mark_rollup_day_on_save(sender, instance, **kwargs):
+    mark_dirty_days(event_days(instance))
+
+
+@receiver(post_delete, sender=Event)
+def mark_rollup_day_on_delete(sender, instance, **kwargs):
+    mark_dirty_days([instance.date])
+
+
+@receiver(m2m_changed, sender=Participation)
+def mark_rollup_days_on_rsvp_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in RSVP_CHANGES:
+        return
+    if reverse:
+        mark_events_dirty(changed_event_ids(instance, action, reverse, pk_set))
+    else:
+        mark_dirty_days([instance.date])
+
+
+# Calendar windows are cached for a long time, so they are only retired once
+# the change is committed; a reader can't then cache the old rows as current.
+@receiver(post_save, sender=Event)
+def expire_calendar_months_on_save(sender, instance, **kwargs):
+    days = event_days(instance)
+    transaction.on_commit(lambda: bump_month_versions(days))
+
+
+@receiver(post_delete, sender=Event)
+def expire_calendar_month_on_delete(sender, instance, **kwargs):
+    day = instance.date
+    transaction.on_commit(lambda: bump_month_versions([day]))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def expire_category_calendar_title(sender, instance, **kwargs):
+    expire_calendar_title(category_id=instance.pk)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def expire_organizer_calendar_title(sender, instance, **kwargs):
+    expire_calendar_title(organizer_id=instance.pk)
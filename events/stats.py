@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from core.db import primary_reads
+from events.models import Event
+from events.rollups import event_totals
+
+
+DASHBOARD_STATS_TTL = getattr(settings, 'DASHBOARD_STATS_TTL', 60)
+
+
+PARTICIPANT_TOTAL_KEY = 'participant_total'
+
+
+def _stats_cache_key(today):
+    return f'dashboard_stats:{today.isoformat()}'
+
+
+def participant_total():
+    """
+    People with at least one RSVP. A per-user EXISTS probe keeps this
+    proportional to the number of users rather than of RSVPs.
+    """
+    total = cache.get(PARTICIPANT_TOTAL_KEY)
+    if total is None:
+        rsvps = Event.participants.through.objects.filter(customuser_id=OuterRef('pk'))
+        with primary_reads():
+            total = get_user_model().objects.filter(Exists(rsvps)).count()
+        cache.set(PARTICIPANT_TOTAL_KEY, total, DASHBOARD_STATS_TTL)
+    return total
+
+
+def dashboard_stats():
+    """
+    Totals shown on the admin, organizer and participant dashboards.
+
+    Event counts come from the daily rollup (events.rollups), so they cost
+    the same however many RSVPs there are, and are cached for a short
+    while; event and RSVP changes drop the cached copy. The cached copy is
+    always computed on the primary, since a lagging replica's totals would
+    outlive the invalidation that just ran.
+    """
+    today = timezone.localdate()
+    key = _stats_cache_key(today)
+    stats = cache.get(key)
+    if stats is None:
+        with primary_reads():
+            stats = {**event_totals(today), 'total_participants': participant_total()}
+        cache.set(key, stats, DASHBOARD_STATS_TTL)
+    return stats
+
+
+def invalidate_dashboard_stats():
+    cache.delete_many([_stats_cache_key(timezone.localdate()), PARTICIPANT_TOTAL_KEY])
@@ -1,3 +1,677 @@
-from django.test import TestCase
+import importlib
+import json
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time, timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.http import HttpResponseNotFound
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, reverse
+from PIL import Image
+from django.utils import timezone
+from core.testing import QueryBudgetTestCase, seed_benchmark_data, url_names
+from event_management import urls as root_urls
+from events import urls as event_urls
+from events.cache import _page_cache_key, aget_content_version, conditional_page
+from events.calendars import add_months
+from events.exports import stream_csv
+from events.models import Event, Category, UserProfile, DailyEventRollup, RollupDirtyDay
+from events.pagination import KeysetPaginator, apaginate
+from events.renditions import build_renditions
+from events.rollups import _refresh_batch, event_totals, refresh_rollups, REFRESH_BATCH_DAYS
+from events.views import EVENT_ATTENDEES_SHOWN
 
-# Create your tests here.
+
+User = get_user_model()
+
+
+class EventQueryPlanTests(TestCase):
+    """The list and dashboard filters on Event must be served by an index, not a table scan."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizers = User.objects.bulk_create([
+            User(username=f'organizer{i}', email=f'organizer{i}@example.com', phone=f'0170000{i:04d}')
+            for i in range(20)
+        ])
+        cls.categories = Category.objects.bulk_create([
+            Category(name=f'Category {i}', description='Seeded') for i in range(10)
+        ])
+        start = date(2025, 1, 1)
+        Event.objects.bulk_create([
+            Event(
+                name=f'Event {i}', description='Seeded', date=start + timedelta(days=i % 365), time=time(10),
+                location='Dhaka', category=cls.categories[i % 10], organizer=cls.organizers[i % 20],
+            )
+            for i in range(3000)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        cls.today = start + timedelta(days=180)
+
+    def assertUsesIndex(self, queryset):
+        if connection.vendor == 'postgresql':
+            # Only "can an index serve this?" matters, not the planner's cost choice on a small table.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+            self.assertNotIn('Seq Scan', plan, plan)
+        else:
+            plan = queryset.explain()
+            table_scans = re.findall(r'SCAN (events_event|events_category)\s*$', plan, re.MULTILINE)
+            self.assertFalse(table_scans, plan)
+
+    def test_date_equality(self):
+        self.assertUsesIndex(Event.objects.filter(date=self.today))
+
+    def test_upcoming_events_page(self):
+        self.assertUsesIndex(Event.objects.filter(date__gte=self.today).order_by('date', 'id')[:12])
+
+    def test_past_events(self):
+        self.assertUsesIndex(Event.objects.filter(date__lt=self.today))
+
+    def test_date_range(self):
+        self.assertUsesIndex(Event.objects.filter(date__range=[self.today, self.today + timedelta(days=7)]))
+
+    def test_category_by_id(self):
+        self.assertUsesIndex(Event.objects.filter(category=self.categories[3]).order_by('date'))
+
+    def test_category_by_name(self):
+        self.assertUsesIndex(Event.objects.filter(category__name='Category 3').order_by('date'))
+
+    def test_organizer_events(self):
+        self.assertUsesIndex(Event.objects.filter(organizer=self.organizers[5]).order_by('date'))
+
+
+class RSVPCapacityTests(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create(username='organizer', email='organizer@example.com', phone='01800000000')
+        self.category = Category.objects.create(name='Tech', description='Tech events')
+        self.event = Event.objects.create(
+            name='Meetup', description='Monthly meetup', date=date(2025, 6, 1), time=time(18),
+            location='Dhaka', category=self.category, organizer=self.organizer, capacity=2,
+        )
+        self.users = [
+            User.objects.create(username=f'guest{i}', email=f'guest{i}@example.com', phone=f'0190000000{i}')
+            for i in range(3)
+        ]
+
+    def test_user_cannot_rsvp_twice(self):
+        self.assertTrue(self.event.add_rsvp(self.users[0]))
+        self.assertFalse(self.event.add_rsvp(self.users[0]))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, 1)
+
+    def test_rsvp_stops_at_capacity(self):
+        self.assertTrue(self.event.add_rsvp(self.users[0]))
+        self.assertTrue(self.event.add_rsvp(self.users[1]))
+        self.assertFalse(self.event.add_rsvp(self.users[2]))
+        self.event.refresh_from_db()
+        self.assertTrue(self.event.is_full)
+        self.assertEqual(self.event.participants.count(), 2)
+
+    def test_cancel_frees_a_seat(self):
+        self.event.add_rsvp(self.users[0])
+        self.event.add_rsvp(self.users[1])
+        self.assertTrue(self.event.cancel_rsvp(self.users[0]))
+        self.assertTrue(self.event.add_rsvp(self.users[2]))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, 2)
+
+    def test_toggle_reports_what_happened(self):
+        self.assertEqual(self.event.toggle_rsvp(self.users[0]), Event.RSVP_ADDED)
+        self.assertEqual(self.event.toggle_rsvp(self.users[1]), Event.RSVP_ADDED)
+        self.assertEqual(self.event.toggle_rsvp(self.users[2]), Event.RSVP_FULL)
+        self.assertEqual(self.event.toggle_rsvp(self.users[0]), Event.RSVP_REMOVED)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, 1)
+
+
+class EventDetailTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        organizer = User.objects.create(username='organizer', email='organizer@example.com', phone='01800000000')
+        self.event = Event.objects.create(
+            name='Popular talk', description='Talk', date=date(2030, 1, 1), time=time(18), location='Dhaka',
+            category=Category.objects.create(name='Tech', description='Tech events'), organizer=organizer,
+        )
+        for i in range(EVENT_ATTENDEES_SHOWN + 2):
+            self.event.add_rsvp(User.objects.create(
+                username=f'guest{i}', first_name='Guest', last_name=f'No{i:02d}', email=f'guest{i}@example.com',
+                phone=f'019000000{i:02d}',
+            ))
+
+    def test_detail_names_a_capped_list_of_attendees(self):
+        response = self.client.get(reverse('event_detail', kwargs={'id': self.event.id}))
+        self.assertContains(response, 'Guest No00')
+        self.assertNotContains(response, f'Guest No{EVENT_ATTENDEES_SHOWN:02d}')
+        self.assertContains(response, 'and 2 more')
+
+    def test_missing_event_is_not_revalidated(self):
+        response = self.client.get(reverse('event_detail', kwargs={'id': self.event.id + 1}))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+
+        # A view that returns its error page instead of raising Http404.
+        view = conditional_page(last_modified_func=lambda request: timezone.now())(
+            lambda request: HttpResponseNotFound()
+        )
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        response = view(request)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        etag = self.client.get(reverse('event_detail', kwargs={'id': self.event.id}))['ETag']
+        response = self.client.get(reverse('event_detail', kwargs={'id': self.event.id}), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentRSVPTests(TransactionTestCase):
+    """A burst of simultaneous RSVPs must never push an event past its capacity."""
+
+    CAPACITY = 50
+    ATTENDEES = 300
+    WORKERS = 30
+
+    def setUp(self):
+        organizer = User.objects.create(username='organizer', email='organizer@example.com', phone='01800000000')
+        category = Category.objects.create(name='Tech', description='Tech events')
+        self.event = Event.objects.create(
+            name='Launch', description='Product launch', date=date(2025, 6, 1), time=time(18),
+            location='Dhaka', category=category, organizer=organizer, capacity=self.CAPACITY,
+        )
+        self.attendees = User.objects.bulk_create([
+            User(username=f'attendee{i}', email=f'attendee{i}@example.com', phone=f'0171{i:07d}')
+            for i in range(self.ATTENDEES)
+        ])
+
+    def rsvp(self, user):
+        try:
+            return Event.objects.get(pk=self.event.pk).add_rsvp(user)
+        finally:
+            connections.close_all()
+
+    def test_concurrent_rsvps_respect_capacity(self):
+        # Everyone tries twice so duplicate clicks race as well.
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            results = list(pool.map(self.rsvp, self.attendees * 2))
+
+        self.event.refresh_from_db()
+        self.assertEqual(sum(results), self.CAPACITY)
+        self.assertEqual(self.event.participant_count, self.CAPACITY)
+        self.assertEqual(self.event.participants.count(), self.CAPACITY)
+
+    def toggle(self, user):
+        try:
+            return user.pk, Event.objects.get(pk=self.event.pk).toggle_rsvp(user)
+        finally:
+            connections.close_all()
+
+    def test_double_clicked_toggles_add_then_remove(self):
+        clickers = self.attendees[:self.WORKERS]
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            results = list(pool.map(self.toggle, clickers * 2))
+
+        for user in clickers:
+            outcomes = sorted(result for pk, result in results if pk == user.pk)
+            self.assertEqual(outcomes, sorted([Event.RSVP_ADDED, Event.RSVP_REMOVED]))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, 0)
+
+
+class ImportEventsCommandTests(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create(username='organizer', email='organizer@example.com', phone='01800000000')
+        self.guests = User.objects.bulk_create([
+            User(username=f'guest{i}', email=f'guest{i}@example.com', phone=f'0190000000{i}') for i in range(3)
+        ])
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def write(self, name, content):
+        path = Path(self.dir.name) / name
+        path.write_text(content)
+        return str(path)
+
+    def test_import_applies_signal_effects_once(self):
+        events = self.write('events.jsonl', '\n'.join(json.dumps(row) for row in [
+            {'ref': 'a', 'name': 'Meetup', 'date': '2025-06-01', 'time': '18:00', 'location': 'Dhaka',
+             'category': 'Tech', 'organizer': 'organizer', 'capacity': 50},
+            {'ref': 'b', 'name': 'Workshop', 'date': '2025-06-02', 'time': '10:00', 'location': 'Dhaka',
+             'category': 'Tech', 'organizer': 'organizer'},
+            {'ref': 'c', 'name': 'Broken', 'date': 'not a date', 'time': '10:00', 'category': 'Tech',
+             'organizer': 'organizer'},
+        ]))
+        rsvps = self.write('rsvps.csv', 'event_ref,user\na,guest0\na,guest1\na,guest1\nb,guest2\nb,nobody\n')
+
+        call_command('import_events', events=events, rsvps=rsvps, stdout=StringIO(), stderr=StringIO())
+
+        counts = dict(Event.objects.values_list('name', 'participant_count'))
+        self.assertEqual(counts, {'Meetup': 2, 'Workshop': 1})
+        self.assertEqual(Category.objects.filter(name='Tech').count(), 1)
+        self.assertEqual(UserProfile.objects.get(user=self.organizer).role, 'organizer')
+
+
+class DailyRollupTests(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create(username='organizer', email='organizer@example.com', phone='01800000000')
+        self.category = Category.objects.create(name='Tech', description='Tech events')
+        self.guests = User.objects.bulk_create([
+            User(username=f'guest{i}', email=f'guest{i}@example.com', phone=f'0190000000{i}') for i in range(3)
+        ])
+        self.today = date(2025, 6, 1)
+        self.events = [
+            Event.objects.create(
+                name=f'Event {i}', description='Talk', date=self.today + timedelta(days=i - 1), time=time(18),
+                location='Dhaka', category=self.category, organizer=self.organizer,
+            )
+            for i in range(3)
+        ]
+        for guest in self.guests:
+            self.events[1].add_rsvp(guest)
+
+    def raw_totals(self):
+        events = Event.objects.all()
+        return {
+            'total_events': events.count(),
+            'total_upcoming_events': events.filter(date__gte=self.today).count(),
+            'total_past_events': events.filter(date__lt=self.today).count(),
+            'total_today_events': events.filter(date=self.today).count(),
+        }
+
+    def test_refresh_only_processes_dirty_days(self):
+        self.assertEqual(refresh_rollups(), 3)
+        self.assertFalse(RollupDirtyDay.objects.exists())
+        row = DailyEventRollup.objects.get(day=self.today)
+        self.assertEqual((row.events, row.rsvps), (1, 3))
+
+        self.events[1].cancel_rsvp(self.guests[0])
+        self.assertEqual(refresh_rollups(), 1)
+        self.assertEqual(DailyEventRollup.objects.get(day=self.today).rsvps, 2)
+
+    def test_day_marked_during_refresh_stays_dirty(self):
+        refresh_rollups()
+        self.events[1].cancel_rsvp(self.guests[0])
+        # Stands in for a change marked after the refresh claimed the day.
+        RollupDirtyDay.objects.filter(day=self.today).update(marked_at=timezone.now() + timedelta(minutes=1))
+
+        self.assertEqual(_refresh_batch(REFRESH_BATCH_DAYS), 1)
+        self.assertTrue(RollupDirtyDay.objects.filter(day=self.today).exists())
+        self.assertEqual(DailyEventRollup.objects.get(day=self.today).rsvps, 2)
+
+        self.events[1].add_rsvp(self.guests[0])
+        self.assertEqual(refresh_rollups(), 1)
+        self.assertFalse(RollupDirtyDay.objects.exists())
+        self.assertEqual(DailyEventRollup.objects.get(day=self.today).rsvps, 3)
+
+    def test_moving_an_event_updates_both_days(self):
+        refresh_rollups()
+        event = self.events[0]
+        old_day, event.date = event.date, date(2025, 7, 1)
+        event.save()
+
+        self.assertEqual(set(RollupDirtyDay.objects.values_list('day', flat=True)), {old_day, event.date})
+        refresh_rollups()
+        self.assertFalse(DailyEventRollup.objects.filter(day=old_day).exists())
+        self.assertEqual(DailyEventRollup.objects.get(day=event.date).events, 1)
+
+    def test_totals_are_exact_before_and_after_refresh(self):
+        self.assertEqual(event_totals(self.today), self.raw_totals())
+        refresh_rollups()
+        self.events[2].delete()
+        Event.objects.create(
+            name='Late addition', description='Talk', date=self.today, time=time(20),
+            location='Dhaka', category=self.category, organizer=self.organizer,
+        )
+        self.assertEqual(event_totals(self.today), self.raw_totals())
+        refresh_rollups()
+        self.assertEqual(event_totals(self.today), self.raw_totals())
+        self.assertEqual(event_totals(self.today, organizer_id=self.guests[0].id)['total_events'], 0)
+
+    def test_full_rebuild_command(self):
+        refresh_rollups()
+        DailyEventRollup.objects.all().delete()
+        out = StringIO()
+        call_command('refresh_rollups', '--full', stdout=out)
+        self.assertIn('Refreshed 3 day(s)', out.getvalue())
+        self.assertEqual(DailyEventRollup.objects.count(), 3)
+
+
+class RenditionCacheTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        cache.clear()
+
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 800), 'teal').save(buffer, format='JPEG')
+        image_name = default_storage.save('event_images/poster.jpg', ContentFile(buffer.getvalue()))
+        organizer = User.objects.create(username='organizer', email='organizer@example.com', phone='01800000000')
+        self.event = Event.objects.create(
+            name='Poster talk', description='Talk', date=date(2030, 1, 1), time=time(18), location='Dhaka',
+            category=Category.objects.create(name='Tech', description='Tech events'), organizer=organizer,
+            event_image=image_name,
+        )
+
+    def test_cached_card_picks_up_renditions(self):
+        self.assertNotContains(self.client.get(reverse('event_list')), 'poster_thumb')
+        build_renditions(self.event)
+        response = self.client.get(reverse('event_list'))
+        self.assertContains(response, 'poster_thumb.jpg')
+        self.assertContains(response, 'poster_card.webp')
+
+    def test_sources_with_the_same_stem_keep_their_own_renditions(self):
+        build_renditions(self.event)
+        thumb = self.event.image_renditions['jpeg']['thumb']
+        with default_storage.open(thumb) as file:
+            original = file.read()
+
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 800), 'orange').save(buffer, format='PNG')
+        other = Event.objects.create(
+            name='Other poster', description='Talk', date=date(2030, 1, 2), time=time(18), location='Dhaka',
+            category=self.event.category, organizer=self.event.organizer,
+            event_image=default_storage.save('event_images/poster.png', ContentFile(buffer.getvalue())),
+        )
+        build_renditions(other)
+        self.assertNotEqual(other.image_renditions['jpeg']['thumb'], thumb)
+
+        # Rebuilding reuses the stored files instead of rewriting them.
+        build_renditions(self.event)
+        self.assertEqual(self.event.image_renditions['jpeg']['thumb'], thumb)
+        with default_storage.open(thumb) as file:
+            self.assertEqual(file.read(), original)
+
+
+def reload_urls():
+    importlib.reload(event_urls)
+    importlib.reload(root_urls)
+    clear_url_caches()
+
+
+class AsyncEventViewTests(TestCase):
+    """The events.async_views pages, routed as they are with ASYNC_EVENT_VIEWS on."""
+
+    def setUp(self):
+        self.enterContext(override_settings(ASYNC_EVENT_VIEWS=True))
+        reload_urls()
+        self.addCleanup(reload_urls)
+        cache.clear()
+
+        organizer = User.objects.create(username='organizer', email='organizer@example.com', phone='01800000000')
+        category = Category.objects.create(name='Tech', description='Tech events')
+        self.events = Event.objects.bulk_create([
+            Event(
+                name=f'Async event {i:02d}', description='Talk', date=date(2030, 1, 1) + timedelta(days=i),
+                time=time(18), location='Dhaka', category=category, organizer=organizer, capacity=5,
+            )
+            for i in range(13)
+        ])
+        self.guest = User.objects.create(username='guest', email='guest@example.com', phone='01900000000')
+
+    async def test_list_is_served_by_async_view_and_paginates(self):
+        response = await self.async_client.get(reverse('event_list'))
+        self.assertEqual(response.resolver_match.func.__module__, 'events.async_views')
+        self.assertContains(response, 'Async event 00')
+        self.assertNotContains(response, 'Async event 12')
+
+        next_url = re.search(r'href="(\?cursor=[^"]+)"', response.content.decode()).group(1)
+        response = await self.async_client.get(reverse('event_list') + next_url.replace('&amp;', '&'))
+        self.assertContains(response, 'Async event 12')
+        self.assertNotContains(response, 'Async event 00')
+
+    async def test_detail(self):
+        event = self.events[0]
+        response = await self.async_client.get(reverse('event_detail', kwargs={'id': event.id}))
+        self.assertEqual(response.resolver_match.func.__module__, 'events.async_views')
+        self.assertContains(response, event.name)
+
+    async def test_rsvp_toggles_and_redirects(self):
+        event = self.events[0]
+        await self.async_client.aforce_login(self.guest)
+        url = reverse('event_rsvp', kwargs={'id': event.id})
+
+        response = await self.async_client.get(url, follow=True)
+        self.assertRedirects(response, reverse('event_detail', kwargs={'id': event.id}))
+        self.assertContains(response, 'You have successfully RSVP for the event.')
+        self.assertTrue(await event.participants.filter(pk=self.guest.pk).aexists())
+
+        response = await self.async_client.get(url, follow=True)
+        self.assertContains(response, 'You have successfully canceled your RSVP.')
+        self.assertFalse(await event.participants.filter(pk=self.guest.pk).aexists())
+
+    async def test_anonymous_page_is_served_from_cache(self):
+        url = reverse('event_detail', kwargs={'id': self.events[0].id})
+        await self.async_client.get(url)
+        # A queryset update sends no signal, so only a cache hit still shows the old name.
+        await Event.objects.filter(pk=self.events[0].pk).aupdate(name='Renamed')
+        response = await self.async_client.get(url)
+        self.assertContains(response, 'Async event 00')
+        self.assertNotContains(response, 'Renamed')
+
+    async def test_conditional_get(self):
+        url = reverse('event_list')
+        response = await self.async_client.get(url)
+        response = await self.async_client.get(url, headers={'if-none-match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_stale_page_is_served_while_another_request_rebuilds(self):
+        url = reverse('event_detail', kwargs={'id': self.events[0].id})
+        key = _page_cache_key(
+            RequestFactory().get(url), 'event_detail', (), {'id': self.events[0].id}, await aget_content_version(),
+        )
+        await cache.aset(key, {'content': b'stale page', 'content_type': 'text/html', 'fresh_until': 0})
+        await cache.aadd(f'{key}:lock', 1)
+
+        response = await self.async_client.get(url)
+        self.assertEqual(response.content, b'stale page')
+
+        # Without a stale copy the request stops waiting for the lock holder and renders itself.
+        await cache.adelete(key)
+        response = await self.async_client.get(url)
+        self.assertContains(response, 'Async event 00')
+
+    async def test_apaginate_matches_page(self):
+        queryset = Event.objects.all()
+        first = await apaginate(RequestFactory().get('/'), queryset, ('date', 'id'), per_page=5)
+        self.assertEqual([event.id for event in first], [event.id for event in self.events[:5]])
+        self.assertIsNone(first.prev_url)
+
+        paginator = KeysetPaginator(queryset, ('date', 'id'), per_page=5)
+        last = await paginator.apage(paginator.encode_cursor(self.events[9], 'n'))
+        self.assertEqual([event.id for event in last], [event.id for event in self.events[10:]])
+        self.assertFalse(last.has_next)
+        self.assertTrue(last.has_previous)
+        previous = await paginator.apage(last.prev_cursor)
+        self.assertEqual([event.id for event in previous], [event.id for event in self.events[5:10]])
+        self.assertTrue(previous.has_next)
+
+
+class CsvExportTests(TestCase):
+    def test_formula_cells_are_neutralised(self):
+        rows = [['=HYPERLINK("http://evil")', '+1', '-2+3', '@SUM(A1)', 'plain', 42, None]]
+        content = ''.join(stream_csv(['a', 'b', 'c', 'd', 'e', 'f', 'g'], rows))
+        self.assertEqual(
+            content.splitlines()[1],
+            '"\'=HYPERLINK(""http://evil"")",\'+1,\'-2+3,\'@SUM(A1),plain,42,',
+        )
+
+
+class CalendarTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create(username='organizer', email='organizer@example.com', phone='01800000000')
+        self.tech = Category.objects.create(name='Tech', description='Tech events')
+        self.music = Category.objects.create(name='Music', description='Concerts')
+        this_month = timezone.localdate().replace(day=1)
+        self.next_month = add_months(this_month, 1)
+        self.talk = self.create_event('Talk', this_month + timedelta(days=2), self.tech)
+        self.concert = self.create_event('Concert', self.next_month + timedelta(days=4), self.music)
+
+    def create_event(self, name, day, category):
+        return Event.objects.create(
+            name=name, description=name, date=day, time=time(18), location='Dhaka',
+            category=category, organizer=self.organizer,
+        )
+
+    def test_feed_is_served_from_cache_and_revalidated(self):
+        response = self.client.get(reverse('calendar_feed'))
+        body = response.content.decode()
+        self.assertIn('SUMMARY:Talk', body)
+        self.assertIn('SUMMARY:Concert', body)
+        self.assertIn('X-WR-CALNAME:All events', body)
+        self.assertIn('public', response['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('calendar_feed')).content.decode(), body)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('calendar_feed'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_change_only_expires_its_month(self):
+        etag = self.client.get(reverse('calendar_feed'))['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.concert.name = 'Open air concert'
+            self.concert.save()
+
+        # The feed changes, but only the concert's month is queried again.
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('calendar_feed'))
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('SUMMARY:Open air concert', response.content.decode())
+        self.assertEqual(len(queries), 1)
+        self.assertIn(str(self.next_month), queries[0]['sql'])
+
+    def test_moving_an_event_expires_both_months(self):
+        self.client.get(reverse('event_calendar') + f'?month={self.next_month:%Y-%m}')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.talk.date = self.next_month
+            self.talk.save()
+        self.client.cookies.clear()
+        page = self.client.get(reverse('event_calendar') + f'?month={self.next_month:%Y-%m}')
+        self.assertContains(page, 'Talk')
+        self.assertContains(page, 'Concert')
+
+    def test_filtered_feeds(self):
+        body = self.client.get(reverse('category_calendar_feed', args=[self.music.id])).content.decode()
+        self.assertIn('SUMMARY:Concert', body)
+        self.assertNotIn('SUMMARY:Talk', body)
+        self.assertIn('X-WR-CALNAME:Music events', body)
+        body = self.client.get(reverse('organizer_calendar_feed', args=[self.organizer.id])).content.decode()
+        self.assertIn('X-WR-CALNAME:Events by organizer', body)
+        self.assertIn('SUMMARY:Talk', body)
+
+    def test_renaming_changes_the_feed_title(self):
+        url = reverse('category_calendar_feed', args=[self.music.id])
+        etag = self.client.get(url)['ETag']
+        self.music.name = 'Live music'
+        self.music.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('X-WR-CALNAME:Live music events', response.content.decode())
+
+        url = reverse('organizer_calendar_feed', args=[self.organizer.id])
+        self.client.get(url)
+        self.organizer.username = 'host'
+        self.organizer.save()
+        self.assertIn('X-WR-CALNAME:Events by host', self.client.get(url).content.decode())
+
+    def test_calendar_page_filters_by_category(self):
+        page = self.client.get(reverse('event_calendar') + f'?month={self.next_month:%Y-%m}&category={self.tech.id}')
+        self.assertNotContains(page, 'Concert')
+        self.assertContains(page, reverse('category_calendar_feed', args=[self.tech.id]))
+
+
+class EventViewBudgetTests(QueryBudgetTestCase):
+    """Query budgets for every route in events/urls.py; a page that grows an N+1 goes over."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_benchmark_data()
+        cls.event = Event.objects.order_by('id').first()
+        cls.organizer = cls.event.organizer
+        cls.participant = User.objects.filter(groups__name='Participant').order_by('id').first()
+        cls.admin = User.objects.filter(groups__name='Admin').get()
+        cls.category = Category.objects.order_by('id').first()
+        Category.objects.filter(pk=cls.category.pk).update(organizer=cls.organizer)
+
+    def test_every_route_has_a_budget(self):
+        measured = {
+            'event_list', 'event_detail', 'event_create', 'event_update', 'event_delete', 'event_rsvp',
+            'participant_list', 'contact', 'organizer-dashboard', 'participant-dashboard', 'category_create',
+            'category_update', 'category_delete', 'api-event-list', 'api-event-detail',
+            'api-event-participant-count', 'api-category-list', 'event_participants_csv', 'event_ics',
+            'organizer_events_csv', 'organizer_events_ics', 'organizer_participants_csv', 'event_calendar',
+            'calendar_feed', 'category_calendar_feed', 'organizer_calendar_feed',
+        }
+        self.assertEqual(url_names(event_urls.urlpatterns) - measured, set())
+
+    def test_public_pages(self):
+        event = self.event.id
+        self.assertQueryBudget('event_list', reverse('event_list'), 3)
+        self.assertQueryBudget('event_list', reverse('event_list') + '?q=tech', 3)
+        self.assertQueryBudget('event_list', reverse('event_list') + f'?category={self.category.id}', 3)
+        self.assertQueryBudget('event_detail', reverse('event_detail', args=[event]), 3)
+        self.assertQueryBudget('contact', reverse('contact'), 0)
+        self.assertQueryBudget('api-event-list', reverse('api-event-list') + '?limit=100', 1)
+        self.assertQueryBudget('api-event-detail', reverse('api-event-detail', args=[event]), 1)
+        self.assertQueryBudget('api-event-participant-count', reverse('api-event-participant-count', args=[event]), 1)
+        self.assertQueryBudget('api-category-list', reverse('api-category-list'), 1)
+
+    def test_calendar_pages(self):
+        self.assertQueryBudget('event_calendar', reverse('event_calendar'), 2)
+        self.assertQueryBudget('event_calendar', reverse('event_calendar') + f'?category={self.category.id}', 3)
+        self.assertQueryBudget('calendar_feed', reverse('calendar_feed'), 1)
+        self.assertQueryBudget('category_calendar_feed', reverse('category_calendar_feed', args=[self.category.id]), 2)
+        self.assertQueryBudget('organizer_calendar_feed', reverse('organizer_calendar_feed', args=[self.organizer.id]), 2)
+
+    def test_participant_pages(self):
+        self.client.force_login(self.participant)
+        dashboard = reverse('participant-dashboard')
+        self.assertQueryBudget('event_list', reverse('event_list'), 6)
+        self.assertQueryBudget('event_detail', reverse('event_detail', args=[self.event.id]), 6)
+        self.assertQueryBudget('participant-dashboard', dashboard, 10)
+        self.assertQueryBudget('participant-dashboard', dashboard + '?filter=total_events', 10)
+        self.assertQueryBudget('participant-dashboard', dashboard + '?filter=upcoming_events', 10)
+        self.assertQueryBudget('participant_list', reverse('participant_list'), 3)
+        self.assertQueryBudget('event_rsvp', reverse('event_rsvp', args=[self.event.id]), 14, method='post', status=302)
+
+    def test_organizer_pages(self):
+        self.client.force_login(self.organizer)
+        event, dashboard = self.event.id, reverse('organizer-dashboard')
+        self.assertQueryBudget('organizer-dashboard', dashboard, 9)
+        self.assertQueryBudget('organizer-dashboard', dashboard + '?filter=total_events', 9)
+        self.assertQueryBudget('organizer-dashboard', dashboard + f'?category={self.category.name}', 9)
+        self.assertQueryBudget('event_create', reverse('event_create'), 4)
+        self.assertQueryBudget('event_update', reverse('event_update', args=[event]), 7)
+        self.assertQueryBudget('event_delete', reverse('event_delete', args=[event]), 5)
+        self.assertQueryBudget('category_create', reverse('category_create'), 3)
+        self.assertQueryBudget('category_update', reverse('category_update', args=[self.category.id]), 5)
+
+    def test_organizer_exports(self):
+        self.client.force_login(self.organizer)
+        event = self.event.id
+        self.assertQueryBudget('event_participants_csv', reverse('event_participants_csv', args=[event]), 4)
+        self.assertQueryBudget('event_ics', reverse('event_ics', args=[event]), 4)
+        self.assertQueryBudget('organizer_events_csv', reverse('organizer_events_csv'), 4)
+        self.assertQueryBudget('organizer_events_ics', reverse('organizer_events_ics'), 4)
+        self.assertQueryBudget('organizer_participants_csv', reverse('organizer_participants_csv'), 4)
+
+    def test_category_delete(self):
+        category = Category.objects.create(name='Disposable', description='Empty', organizer=self.organizer)
+        self.client.force_login(self.organizer)
+        self.assertQueryBudget('category_delete', reverse('category_delete', args=[category.id]), 9, status=302)
@@ -1,7 +1,11 @@
+from django.conf import settings
 from django.urls import path
-from events import views
-from events.views import event_list, event_detail, event_rsvp, participant_list, contact_page, participant_dashboard, category_update, category_delete, EventCreate, EventUpdate, EventDelete, OrganizerDashboard, CategoryCreate
+from events import views, api, exports, async_views, calendars
+from events.views import participant_list, contact_page, participant_dashboard, category_update, category_delete, EventCreate, EventUpdate, EventDelete, OrganizerDashboard, CategoryCreate
 
+# The public event pages have native async versions for ASGI deployments.
+public_views = async_views if settings.ASYNC_EVENT_VIEWS else views
+event_list, event_detail, event_rsvp = public_views.event_list, public_views.event_detail, public_views.event_rsvp
 
 urlpatterns = [
     path('', event_list, name='event_list'),  # Event list page
@@ -17,6 +21,19 @@ urlpatterns = [
     path("category/create/", CategoryCreate.as_view(), name="category_create"),
     path("category/<int:id>/update/", category_update, name="category_update"),
     path('category/<int:id>/delete/', category_delete, name='category_delete'),
+    path('api/events/', api.event_list_api, name='api-event-list'),
+    path('api/events/<int:id>/', api.event_detail_api, name='api-event-detail'),
+    path('api/events/<int:id>/participants/count/', api.event_participant_count_api, name='api-event-participant-count'),
+    path('api/categories/', api.category_list_api, name='api-category-list'),
+    path('events/<int:id>/participants.csv', exports.event_participants_csv, name='event_participants_csv'),
+    path('events/<int:id>/event.ics', exports.event_ics, name='event_ics'),
+    path('organizer/events.csv', exports.organizer_events_csv, name='organizer_events_csv'),
+    path('organizer/events.ics', exports.organizer_events_ics, name='organizer_events_ics'),
+    path('organizer/participants.csv', exports.organizer_participants_csv, name='organizer_participants_csv'),
+    path('calendar/', calendars.event_calendar, name='event_calendar'),
+    path('calendar/events.ics', calendars.calendar_feed, name='calendar_feed'),
+    path('calendar/category/<int:category_id>.ics', calendars.calendar_feed, name='category_calendar_feed'),
+    path('calendar/organizer/<int:organizer_id>.ics', calendars.calendar_feed, name='organizer_calendar_feed'),
 
 ]
 
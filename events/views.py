@@ -1,11 +1,16 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from events.forms import EventForm, CategoryForm
 from events.models import Event, Category
+from events.stats import dashboard_stats, participant_total
+from events.search import search_events
+from events.cache import with_fragment_versions, cache_anonymous_page, conditional_page
+from events.pagination import paginate, EVENTS_PER_PAGE, USERS_PER_PAGE
+from core.db import read_from_replica, pin_after_write
 from django.utils.timezone import now
-from django.db.models import Q, Count
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
 from users.views import is_admin
+from users.roles import has_role
 from datetime import date
 from django.utils import timezone
 from django.urls import reverse, reverse_lazy
@@ -19,50 +24,101 @@ from django.http import HttpResponseForbidden
 User = get_user_model()
 
 def is_organizer(user):
-    return user.groups.filter(name='Organizer').exists()
+    return has_role(user, 'Organizer')
 
 def is_participant(user):
-    return user.groups.filter(name='Participant').exists()
+    return has_role(user, 'Participant')
 
 def is_organizer_or_admin(user):
     return is_organizer(user) or is_admin(user)
 
-# Event List view
-def event_list(request):
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-    category_id = request.GET.get('category')
-    query = request.GET.get('q', '')
-
-    # events = Event.objects.select_related('category').all()
-    events = Event.objects.select_related('category').prefetch_related('participants').all()
-
+def mark_rsvped(events, user):
+    """Set is_rsvped on each event using one query for the viewer's RSVPs."""
+    events = list(events)
+    rsvped_ids = set()
+    if user.is_authenticated and events:
+        rsvped_ids = set(
+            user.rsvp_events.filter(id__in=[event.id for event in events]).values_list('id', flat=True)
+        )
+    for event in events:
+        event.is_rsvped = event.id in rsvped_ids
+    return events
+
+def filter_events(events, params):
+    """Apply the event_list filters (date range, category, search) and return (events, ordering)."""
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    category_id = params.get('category')
 
     if start_date and end_date:
         events = events.filter(date__range=[start_date, end_date])
     if category_id:
         events = events.filter(category_id=category_id)
-    if query:
-        events = events.filter(Q(name__icontains=query) | Q(location__icontains=query))
+    return search_events(events, params.get('q', ''))
+
+
+EVENT_LIST_PARAMS = ('q', 'category', 'start_date', 'end_date', 'cursor')
+
+
+# The detail page names this many attendees; the total comes from participant_count.
+EVENT_ATTENDEES_SHOWN = 10
+
+
+def event_attendees(event_id):
+    return (
+        User.objects.filter(rsvp_events__id=event_id)
+        .only('id', 'username', 'first_name', 'last_name')
+        .order_by('id')[:EVENT_ATTENDEES_SHOWN]
+    )
+
+
+def event_detail_context(event, attendees):
+    more = max(event.participant_count - len(attendees), 0)
+    return {'event': event, 'attendees': attendees, 'more_attendees': more}
+
+
+def event_last_modified(request, id):
+    row = Event.objects.filter(id=id).values_list('updated_at', 'category__updated_at').first()
+    return max(row) if row else None
+
+
+# Event List view
+# Not @read_from_replica: the page and its card fragments are cached under the
+# current version, and a render from a lagging replica right after a version
+# bump would be served as current until the next change.
+@conditional_page(params=EVENT_LIST_PARAMS)
+@cache_anonymous_page(params=EVENT_LIST_PARAMS)
+def event_list(request):
+    events = Event.objects.select_related('category').defer('search_vector')
+    events, ordering = filter_events(events, request.GET)
 
     # events = events.prefetch_related('participants')
     categories = Category.objects.all()
-    total_participants = User.objects.filter(rsvp_events__isnull=False).distinct().count()
+    total_participants = participant_total()
 
 
+    page = paginate(request, events, ordering, per_page=EVENTS_PER_PAGE)
+    page.object_list = with_fragment_versions(page.object_list)
+    mark_rsvped(page.object_list, request.user)
+
     context = {
-        'events': events,
+        'events': page,
+        'page': page,
         'categories': categories,
         'total_participants': total_participants,
     }
     return render(request, 'events/event_list.html', context)
 
 
+@conditional_page(last_modified_func=event_last_modified)
+@cache_anonymous_page()
 def event_detail(request, id):
     # event = get_object_or_404(Event, id=id)
-    event = get_object_or_404(Event.objects.select_related('category').prefetch_related('participants'), id=id)
+    event = get_object_or_404(Event.objects.select_related('category'), id=id)
+    mark_rsvped([event], request.user)
 
-    return render(request, 'events/event_detail.html', {'event': event})
+    context = event_detail_context(event, list(event_attendees(event.id)))
+    return render(request, 'events/event_detail.html', context)
 
 
 # Admin and Organizer Decorator
@@ -144,29 +200,34 @@ def contact_page(request):
     return render(request, 'events/contact.html')
 
 
+RSVP_MESSAGES = {
+    Event.RSVP_ADDED: (messages.SUCCESS, 'You have successfully RSVP for the event.'),
+    Event.RSVP_REMOVED: (messages.SUCCESS, 'You have successfully canceled your RSVP.'),
+    Event.RSVP_FULL: (messages.ERROR, 'Sorry, this event is fully booked.'),
+}
+
+
 @login_required
 @user_passes_test(is_participant, login_url='no-permission')
 def event_rsvp(request, id):
     event = get_object_or_404(Event, id=id)
-    user = request.user
 
-    if user in event.participants.all():
-        event.participants.remove(user)
-        messages.success(request, 'You have successfully canceled your RSVP.')
-    else:
-        event.participants.add(user)
-        messages.success(request, 'You have successfully RSVP for the event.')
+    level, message = RSVP_MESSAGES[event.toggle_rsvp(request.user)]
+    messages.add_message(request, level, message)
 
+    pin_after_write(request)
     return redirect(reverse('event_detail', kwargs={'id': event.id}))
 
 
 @login_required
 def participant_list(request):
-    participants = User.objects.filter(rsvp_events__isnull=False).distinct().order_by('username')  
-    return render(request, 'events/participant_list.html', {'participants': participants})
+    participants = User.objects.filter(rsvp_events__isnull=False).distinct()
+    page = paginate(request, participants, ('username', 'id'), per_page=USERS_PER_PAGE)
+    return render(request, 'events/participant_list.html', {'participants': page, 'page': page})
 
 
 # Oranizer Dashboard View
+@method_decorator(read_from_replica, name='get')
 class OrganizerDashboard(ListView):
     model = Event
     template_name = "events/organizer_dashboard.html"
@@ -181,7 +242,7 @@ class OrganizerDashboard(ListView):
 
     def get_queryset(self):
         today = timezone.now().date()
-        events = Event.objects.select_related("category").prefetch_related("participants").all()
+        events = Event.objects.select_related("category").all()
         filtered_events = events.filter(date=today)
         filter_title = "Today's Events"
 
@@ -216,11 +277,8 @@ class OrganizerDashboard(ListView):
         context = super().get_context_data(**kwargs)
         today = timezone.now().date()
 
-        context["total_participants"] = User.objects.filter(rsvp_events__isnull=False).distinct().count()
-        context["total_events"] = Event.objects.count()
-        context["total_upcoming_events"] = Event.objects.filter(date__gte=timezone.now()).count()
-        context["total_past_events"] = Event.objects.filter(date__lt=timezone.now()).count()
-        context["filtered_events"] = self.get_queryset()
+        context.update(dashboard_stats())
+        context["filtered_events"] = with_fragment_versions(self.get_queryset())
         context["categories"] = Category.objects.all()
         context["filter_title"] = self.filter_title
         context["today_events"] = Event.objects.filter(date=today)
@@ -232,18 +290,16 @@ class OrganizerDashboard(ListView):
 # Paticipant dashbaord 
 @login_required
 @user_passes_test(is_participant, login_url='no-permission')
+@read_from_replica
 def participant_dashboard(request):
     today = timezone.now().date()
 
-    events = Event.objects.select_related('category').prefetch_related('participants').all()
+    events = Event.objects.select_related('category').all()
     today_events = events.filter(date=today)
     # today_events = Event.objects.filter(date=today)
     rsvp_events = request.user.rsvp_events.all()
 
-    total_participants = Event.objects.aggregate(total=Count('participants', distinct=True))['total'] or 0
-    total_events = Event.objects.count()
-    total_upcoming_events = Event.objects.filter(date__gte=timezone.now()).count()
-    total_past_events = Event.objects.filter(date__lt=timezone.now()).count()
+    stats = dashboard_stats()
 
     # events = Event.objects.select_related('category').all()
     filter = request.GET.get('filter', None)
@@ -278,12 +334,9 @@ def participant_dashboard(request):
 
     categories = Category.objects.all()
     context = {
-        'total_participants': total_participants,
-        'total_events': total_events,
-        'total_upcoming_events': total_upcoming_events,
-        'total_past_events': total_past_events,
+        **stats,
         'events': events,
-        'filtered_events': filtered_events,
+        'filtered_events': mark_rsvped(filtered_events, request.user),
         'categories': categories,
         'start_date': start_date,
         'end_date': end_date,
@@ -303,11 +356,11 @@ class CategoryCreate(LoginRequiredMixin, UserPassesTestMixin, CreateView):
     success_url = reverse_lazy("dashboard")
 
     def test_func(self):
-        return self.request.user.is_superuser or self.request.user.groups.filter(name="Organizer").exists()
+        return self.request.user.is_superuser or is_organizer(self.request.user)
 
     def form_valid(self, form):
         category = form.save(commit=False)
-        if self.request.user.groups.filter(name="Organizer").exists():
+        if is_organizer(self.request.user):
             category.organizer = self.request.user
         category.save()
         messages.success(self.request, "Category created successfully!")
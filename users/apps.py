@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class UsersConfig(AppConfig):
@@ -7,3 +8,5 @@ class UsersConfig(AppConfig):
 
     def ready(self):
         import users.signals
+        from users.search import create_user_search_indexes
+        post_migrate.connect(create_user_search_indexes, sender=self)
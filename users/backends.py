@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+USER_CACHE_TTL = getattr(settings, 'USER_CACHE_TTL', 300)
+SESSION_AUTH_HASH = 'session_auth_hash'
+
+
+def _cache_key(user_id):
+    return f'user_snapshot:{user_id}'
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that loads request.user from a cached snapshot of the user row.
+
+    The snapshot holds every concrete field but the password: pages read most
+    of them (is_staff and profile_image on every page, bio and phone on the
+    profile), so a deferred field would only bring the query back. The password
+    hash stays out of the cache; the snapshot keeps the session auth hash
+    (an HMAC of it) that verifying the session needs instead. users.signals
+    drops the snapshot when the user is saved or deleted.
+    """
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        field_names = [
+            field.attname for field in UserModel._meta.concrete_fields if field.attname != 'password'
+        ]
+        snapshot = cache.get(_cache_key(user_id))
+        # A snapshot cached before a field was added or removed is reloaded.
+        if snapshot is None or snapshot.keys() != {*field_names, SESSION_AUTH_HASH}:
+            user = UserModel._default_manager.filter(pk=user_id).first()
+            if user is None:
+                return None
+            snapshot = {name: getattr(user, name) for name in field_names}
+            snapshot[SESSION_AUTH_HASH] = user.get_session_auth_hash()
+            cache.set(_cache_key(user_id), snapshot, USER_CACHE_TTL)
+        values = [snapshot[name] for name in field_names]
+        user = UserModel.from_db(UserModel._default_manager.db, field_names, values)
+        user.get_session_auth_hash = _cached_session_auth_hash(user, snapshot[SESSION_AUTH_HASH])
+        return user if self.user_can_authenticate(user) else None
+
+
+def _cached_session_auth_hash(user, session_auth_hash):
+    """get_session_auth_hash() for a snapshot user, whose password is deferred."""
+    def get_session_auth_hash():
+        # Once the password is loaded or changed (set_password), hash the real one.
+        if 'password' in user.get_deferred_fields():
+            return session_auth_hash
+        return type(user).get_session_auth_hash(user)
+    return get_session_auth_hash
+
+
+def invalidate_users(*user_ids):
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
@@ -127,7 +127,8 @@ class AssignRoleForm(StyledFormMixin, forms.Form):
     
 class CreateGroupForm(StyledFormMixin, forms.ModelForm):
     permissions = forms.ModelMultipleChoiceField(
-        queryset=Permission.objects.all(),
+        # Permission.__str__ shows its content type.
+        queryset=Permission.objects.select_related('content_type'),
         widget=forms.CheckboxSelectMultiple,
         required=False,
         label='Assign Permission'
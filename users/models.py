@@ -8,5 +8,11 @@ class CustomUser(AbstractUser):
     profile_image = models.ImageField(upload_to='profile_images', blank=True, default='profile_images/default.png')
     bio = models.TextField(blank=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Keyset pagination of the admin user table.
+            models.Index(fields=['date_joined', 'id'], name='user_date_joined_id_idx'),
+        ]
+
     def __str__(self):
         return self.username
\ No newline at end of file
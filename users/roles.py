@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.cache import cache
+
+
+ROLE_CACHE_TTL = getattr(settings, 'ROLE_CACHE_TTL', 300)
+
+
+def _cache_key(user_id):
+    return f'user_roles:{user_id}'
+
+
+def get_roles(user):
+    """
+    Group names for a user.
+
+    Loaded once per user instance (so once per request for request.user).
+    With a shared cache (settings.SHARED_CACHE) they are also kept across
+    requests until the user's groups change; a per-process cache is skipped,
+    since invalidate_roles() would only clear it in one worker and a revoked
+    role would keep working in the others.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+
+    roles = getattr(user, '_roles', None)
+    if roles is None:
+        shared = getattr(settings, 'SHARED_CACHE', False)
+        roles = cache.get(_cache_key(user.pk)) if shared else None
+        if roles is None:
+            roles = frozenset(user.groups.values_list('name', flat=True))
+            if shared:
+                cache.set(_cache_key(user.pk), roles, ROLE_CACHE_TTL)
+        user._roles = roles
+    return roles
+
+
+def has_role(user, name):
+    return name in get_roles(user)
+
+
+def invalidate_roles(*user_ids):
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models import OuterRef, Q, Subquery
+from core.db import run_postgres_ddl
+
+
+User = get_user_model()
+
+USER_ORDERING = ('-date_joined', '-id')
+
+# istartswith compiles to UPPER(column::text) LIKE UPPER('prefix%') on
+# PostgreSQL; these expression indexes let it seek instead of scanning every user.
+USER_SEARCH_INDEX_DDL = [
+    "CREATE INDEX IF NOT EXISTS users_customuser_username_prefix ON users_customuser "
+    "(UPPER(username::text) text_pattern_ops)",
+    "CREATE INDEX IF NOT EXISTS users_customuser_email_prefix ON users_customuser "
+    "(UPPER(email::text) text_pattern_ops)",
+]
+
+
+def admin_user_rows(query=''):
+    """
+    Users for the admin user table with their first group as group_name,
+    optionally narrowed to a username or email prefix (case-insensitive).
+    """
+    group_name = Subquery(Group.objects.filter(user=OuterRef('pk')).order_by('id').values('name')[:1])
+    users = User.objects.only('id', 'username', 'email', 'date_joined').annotate(group_name=group_name)
+    query = query.strip()
+    if query:
+        users = users.filter(Q(username__istartswith=query) | Q(email__istartswith=query))
+    return users
+
+
+def create_user_search_indexes(sender, using, **kwargs):
+    run_postgres_ddl(using, USER_SEARCH_INDEX_DDL)
@@ -1,16 +1,21 @@
 from django.dispatch import receiver
-from django.db.models.signals import post_save, m2m_changed, pre_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed, pre_save, pre_delete
 from django.contrib.auth.models import Group
 from django.contrib.auth.tokens import default_token_generator
 from django.conf import settings
-from django.core.mail import send_mail
+from core.tasks import enqueue
 from events.models import Event, UserProfile
 from django.contrib.auth import get_user_model
 from .models import CustomUser
+from .backends import invalidate_users
+from .roles import invalidate_roles
 
 
 User = get_user_model()
 
+RSVP_MAIL_BATCH_SIZE = 500
+
 @receiver(post_save, sender=User)
 def send_activation_email(sender, instance, created, **kwargs):
     if created:
@@ -21,10 +26,7 @@ def send_activation_email(sender, instance, created, **kwargs):
         message = f'Hi {instance.username},\n\nPlease activate your account by clicking the link below:\n{activation_url}\n\nThank You!'
         recipient_list = [instance.email]
 
-        try:
-            send_mail(subject, message, settings.EMAIL_HOST_USER, recipient_list, fail_silently=False)
-        except Exception as e:
-            print(f"Failed to send email to {instance.email}: {str(e)}")
+        enqueue('send_email', subject=subject, message=message, recipient_list=recipient_list, from_email=settings.EMAIL_HOST_USER)
 
 
 @receiver(post_save, sender=User)
@@ -35,17 +37,29 @@ def add_user_to_participant_group(sender, instance, created, **kwargs):
 
 
 @receiver(m2m_changed, sender=Event.participants.through)
-def send_rsvp_confirmation(sender, instance, action, pk_set, **kwargs):
-    if action == "post_add":
-        for user_id in pk_set:
-            user = instance.participants.get(id=user_id)
-            send_mail(
-                subject="RSVP Confirmation",
-                message=f"Hello {user.username},\n\nYou have successfully RSVP for the event '{instance.name}'.",
-                from_email="admin@eventbangla.com",
-                recipient_list=[user.email],
-                fail_silently=False,
-            )
+def send_rsvp_confirmation(sender, instance, action, reverse, pk_set, **kwargs):
+    if action != "post_add" or not pk_set:
+        return
+
+    # One query for every recipient, whichever side of the relation was added to.
+    if reverse:
+        event_names = Event.objects.filter(pk__in=pk_set).values_list('name', flat=True)
+        rsvps = [(instance.username, instance.email, name) for name in event_names]
+    else:
+        users = User.objects.filter(pk__in=pk_set).values_list('username', 'email')
+        rsvps = [(username, email, instance.name) for username, email in users]
+
+    mails = [
+        [
+            "RSVP Confirmation",
+            f"Hello {username},\n\nYou have successfully RSVP for the event '{event_name}'.",
+            "admin@eventbangla.com",
+            [email],
+        ]
+        for username, email, event_name in rsvps if email
+    ]
+    for start in range(0, len(mails), RSVP_MAIL_BATCH_SIZE):
+        enqueue('send_mass_mail', messages=mails[start:start + RSVP_MAIL_BATCH_SIZE])
 
 
 @receiver(post_save, sender=Event)
@@ -62,3 +76,33 @@ def update_user_role(sender, instance, created, **kwargs):
 def set_default_profile_image(sender, instance, **kwargs):
     if not instance.profile_image:
         instance.profile_image = 'profile_images/default.png'
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_cached_roles(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            instance.__dict__.pop('_roles', None)
+            invalidate_roles(instance.pk)
+    elif action == 'pre_clear':
+        invalidate_roles(*instance.user_set.values_list('id', flat=True))
+    elif action in ('post_add', 'post_remove') and pk_set:
+        invalidate_roles(*pk_set)
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidate_group_member_roles(sender, instance, **kwargs):
+    if instance.pk:
+        invalidate_roles(*instance.user_set.values_list('id', flat=True))
+
+
+# Profile edits, password changes and sign-ins all save the user. The snapshot
+# is dropped right away, and again after commit in case another request cached
+# the old row in between.
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_id = instance.pk
+    invalidate_users(user_id)
+    transaction.on_commit(lambda: invalidate_users(user_id))
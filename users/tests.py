@@ -1,3 +1,185 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from core.testing import QueryBudgetTestCase, seed_benchmark_data, url_names
+from users import urls as user_urls
+from users.roles import get_roles
 
-# Create your tests here.
+
+User = get_user_model()
+
+
+# Sessions and users are cached only when CACHE_BACKEND is shared, as in production.
+@override_settings(
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+    AUTHENTICATION_BACKENDS=['users.backends.CachedModelBackend'],
+)
+class CachedUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='member', email='member@example.com', phone='01700000000', password='old-secret-123',
+        )
+        self.client.login(username='member', password='old-secret-123')
+
+    def test_warm_requests_skip_session_and_user_rows(self):
+        self.client.get(reverse('profile'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('profile'))
+        self.assertEqual(response.wsgi_request.user, self.user)
+        tables = ' '.join(query['sql'] for query in queries.captured_queries)
+        self.assertNotIn('django_session', tables)
+        self.assertNotIn('users_customuser', tables)
+
+    def test_snapshot_leaves_out_the_password_hash(self):
+        self.client.get(reverse('profile'))
+        snapshot = cache.get(f'user_snapshot:{self.user.pk}')
+        self.assertNotIn('password', snapshot)
+        self.assertNotIn(self.user.password, snapshot.values())
+        self.assertEqual(snapshot['session_auth_hash'], self.user.get_session_auth_hash())
+
+    def test_profile_edit_is_seen_by_the_next_request(self):
+        self.client.get(reverse('profile'))
+        self.client.post(reverse('edit_profile'), {
+            'email': 'member@example.com', 'first_name': 'New', 'last_name': 'Name', 'phone': '01700000000',
+            'bio': 'Updated bio',
+        })
+        response = self.client.get(reverse('profile'))
+        self.assertContains(response, 'Updated bio')
+        self.assertEqual(response.wsgi_request.user.get_full_name(), 'New Name')
+
+    def test_password_change_signs_out_other_sessions(self):
+        other = Client()
+        other.login(username='member', password='old-secret-123')
+        self.assertTrue(other.get(reverse('profile')).wsgi_request.user.is_authenticated)
+
+        self.client.post(reverse('password_change'), {
+            'old_password': 'old-secret-123', 'new_password1': 'new-secret-456', 'new_password2': 'new-secret-456',
+        })
+        self.assertTrue(self.client.get(reverse('profile')).wsgi_request.user.is_authenticated)
+        self.assertFalse(other.get(reverse('event_list')).wsgi_request.user.is_authenticated)
+
+
+class RoleCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='member', email='member@example.com', phone='01700000000')
+        self.organizers = Group.objects.create(name='Organizer')
+
+    def fresh_roles(self):
+        return get_roles(User.objects.get(pk=self.user.pk))
+
+    @override_settings(SHARED_CACHE=False)
+    def test_per_process_cache_is_not_used(self):
+        self.assertEqual(self.fresh_roles(), {'Participant'})
+        self.assertIsNone(cache.get(f'user_roles:{self.user.pk}'))
+
+    @override_settings(SHARED_CACHE=True)
+    def test_shared_cache_is_cleared_when_groups_change(self):
+        self.assertEqual(self.fresh_roles(), {'Participant'})
+        self.assertEqual(cache.get(f'user_roles:{self.user.pk}'), {'Participant'})
+        self.user.groups.add(self.organizers)
+        self.assertEqual(self.fresh_roles(), {'Participant', 'Organizer'})
+
+
+class AdminUserTableTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', phone='01700000000')
+        self.admin.groups.set([Group.objects.create(name='Admin')])
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', phone='01700000001')
+        self.alicia = User.objects.create_user(username='alicia', email='a.b@example.org', phone='01700000002')
+        self.bob = User.objects.create_user(username='bob', email='ALI@example.net', phone='01700000003')
+        self.client.force_login(self.admin)
+
+    def test_prefix_search_matches_username_or_email(self):
+        response = self.client.get(reverse('user-table'), {'q': 'ali'})
+        self.assertEqual({user.username for user in response.context['users']}, {'alice', 'alicia', 'bob'})
+        response = self.client.get(reverse('user-table'), {'q': 'alic'})
+        self.assertEqual({user.username for user in response.context['users']}, {'alice', 'alicia'})
+        response = self.client.get(reverse('user-table'), {'q': 'lice'})
+        self.assertContains(response, 'No users match')
+
+    def test_group_name_is_annotated(self):
+        users = {user.username: user.group_name for user in self.client.get(reverse('user-table')).context['users']}
+        self.assertEqual(users['admin'], 'Admin')
+        self.assertEqual(users['bob'], 'Participant')
+
+    def test_table_requires_admin_sign_in(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('user-table')).status_code, 302)
+        self.client.force_login(self.alice)
+        self.assertEqual(self.client.get(reverse('user-table')).status_code, 302)
+
+    def test_dashboard_does_not_load_users(self):
+        response = self.client.get(reverse('admin-dashboard'))
+        self.assertNotIn('users', response.context)
+        self.assertContains(response, reverse('user-table'))
+
+
+class UserViewBudgetTests(QueryBudgetTestCase):
+    """Query budgets for every route in users/urls.py; a page that grows an N+1 goes over."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_benchmark_data()
+        cls.admin = User.objects.filter(groups__name='Admin').get()
+        cls.organizer = User.objects.filter(groups__name='Organizer').order_by('id').first()
+        cls.participant = User.objects.filter(groups__name='Participant', rsvp_events__isnull=False).order_by('id').first()
+
+    def test_every_route_has_a_budget(self):
+        measured = {
+            'sign-up', 'sign-in', 'sign-out', 'activate', 'dashboard', 'admin-dashboard', 'create-group',
+            'assign-role', 'group-list', 'user-list', 'user-table', 'remove-participant', 'profile', 'edit_profile',
+            'password_reset', 'password_reset_confirm', 'password_change', 'password_change_done',
+        }
+        self.assertEqual(url_names(user_urls.urlpatterns) - measured, set())
+
+    def test_anonymous_pages(self):
+        self.assertQueryBudget('sign-up', reverse('sign-up'), 0)
+        self.assertQueryBudget('sign-in', reverse('sign-in'), 0)
+        self.assertQueryBudget('password_reset', reverse('password_reset'), 0)
+
+        user = User.objects.filter(username__startswith='bench').last()
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        user.refresh_from_db()
+        token = default_token_generator.make_token(user)
+        self.assertQueryBudget('activate', reverse('activate', args=[user.id, token]), 2, status=302)
+
+        uid = urlsafe_base64_encode(force_bytes(self.participant.pk))
+        token = default_token_generator.make_token(self.participant)
+        self.assertQueryBudget(
+            'password_reset_confirm', reverse('password_reset_confirm', args=[uid, token]), 5, status=302,
+        )
+
+    def test_admin_pages(self):
+        self.client.force_login(self.admin)
+        dashboard = reverse('admin-dashboard')
+        self.assertQueryBudget('dashboard', reverse('dashboard'), 4, status=302)
+        self.assertQueryBudget('admin-dashboard', dashboard, 8)
+        self.assertQueryBudget('admin-dashboard', dashboard + '?filter=upcoming_events', 8)
+        self.assertQueryBudget('create-group', reverse('create-group'), 4)
+        self.assertQueryBudget('assign-role', reverse('assign-role', args=[self.participant.id]), 5)
+        self.assertQueryBudget('group-list', reverse('group-list'), 5)
+        self.assertQueryBudget('user-list', reverse('user-list'), 4)
+        self.assertQueryBudget('user-list', reverse('user-list') + '?q=bench', 4)
+        self.assertQueryBudget('user-table', reverse('user-table'), 4)
+        self.assertQueryBudget('user-table', reverse('user-table') + '?q=bench', 4)
+        self.assertQueryBudget(
+            'remove-participant', reverse('remove-participant', args=[self.participant.id]), 14, status=302,
+        )
+
+    def test_account_pages(self):
+        self.client.force_login(self.organizer)
+        self.assertQueryBudget('dashboard', reverse('dashboard'), 4, status=302)
+        self.assertQueryBudget('profile', reverse('profile'), 2)
+        self.assertQueryBudget('edit_profile', reverse('edit_profile'), 2)
+        self.assertQueryBudget('password_change', reverse('password_change'), 2)
+        self.assertQueryBudget('password_change_done', reverse('password_change_done'), 2)
+        self.assertQueryBudget('sign-out', reverse('sign-out'), 4, status=302)
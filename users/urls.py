@@ -1,5 +1,5 @@
 from django.urls import path
-from users.views import sign_up, sign_in, sign_out, activate_user, admin_dashboard, redirect_dashboard, create_group, assign_role, group_list, user_list, remove_participant, ProfileView, EditProfileView, CustomPasswordResetView, CustomPasswordResetConfirmView, ChangePassword
+from users.views import sign_up, sign_in, sign_out, activate_user, admin_dashboard, redirect_dashboard, create_group, assign_role, group_list, user_list, user_table, remove_participant, ProfileView, EditProfileView, CustomPasswordResetView, CustomPasswordResetConfirmView, ChangePassword
 from django.contrib.auth.views import LogoutView, PasswordChangeDoneView
 
 
@@ -14,6 +14,7 @@ urlpatterns = [
     path('admin/assign-role/<int:user_id>/', assign_role, name='assign-role'),
     path('admin/group-list', group_list, name='group-list'),
     path('admin/user-list', user_list, name='user-list'),
+    path('admin/user-table', user_table, name='user-table'),
     path('admin/remove/<int:user_id>/', remove_participant, name='remove-participant'),
     path('profile/', ProfileView.as_view(), name='profile'),
     path('edit-profile', EditProfileView.as_view(), name='edit_profile'),
@@ -4,12 +4,18 @@ from django.contrib import messages
 from users.forms import LoginForm, CustomRegistrationForm, AssignRoleForm, CreateGroupForm, CustomPasswordChangeForm, CustomPasswordResetForm, CustomPasswordResetConfirmForm, EditProfileForm
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
+from core.db import read_from_replica, pin_after_write
 from django.contrib.auth.models import User, Group
 from django.contrib.auth.tokens import default_token_generator
 from events.models import Event, Category, UserProfile
+from users.roles import has_role
+from users.search import admin_user_rows, USER_ORDERING
+from events.stats import dashboard_stats
+from events.cache import with_fragment_versions
+from events.pagination import paginate, EVENT_ORDERING, EVENTS_PER_PAGE, USERS_PER_PAGE
 from datetime import date
 from django.utils import timezone
-from django.db.models import Count, Prefetch
+from django.db import transaction
 from django.views.generic import TemplateView, UpdateView
 from django.contrib.auth.views import LoginView, PasswordChangeView, PasswordResetView, PasswordResetConfirmView
 from django.urls import reverse_lazy
@@ -34,7 +40,7 @@ class EditProfileView(UpdateView):
 
 # Create your views here.
 def is_admin(user):
-    return user.groups.filter(name='Admin').exists()
+    return has_role(user, 'Admin')
 
 def sign_up(request):
     if request.method == 'POST':
@@ -94,14 +100,11 @@ def activate_user(request, user_id, token):
 
 # Admin dashboard 
 @user_passes_test(is_admin, login_url='no-permission')
+@read_from_replica
 def admin_dashboard(request):
-    events = Event.objects.select_related('category').prefetch_related('participants').all()
+    events = Event.objects.select_related('category').all()
 
-    total_participants = Event.objects.aggregate(total=Count('participants', distinct=True))['total'] or 0
-    # total_events = Event.objects.count()
-    total_events = len(events)
-    total_upcoming_events = Event.objects.filter(date__gte=timezone.now()).count()
-    total_past_events = Event.objects.filter(date__lt=timezone.now()).count()
+    stats = dashboard_stats()
 
     filter = request.GET.get('filter', None)
     category = request.GET.get('category', None)
@@ -134,30 +137,19 @@ def admin_dashboard(request):
         filter_title = f"Events from {start_date} to {end_date}"
 
     categories = Category.objects.all()
-
-    users = User.objects.prefetch_related(
-        Prefetch('groups', queryset=Group.objects.all(), to_attr='all_groups')
-    ).all()
-
-    for user in users:
-        if user.all_groups:
-            user.group_name = user.all_groups[0].name
-        else:
-            user.group_name = 'No Group Assigned'
+    events_page = paginate(request, filtered_events, EVENT_ORDERING, per_page=EVENTS_PER_PAGE)
+    events_page.object_list = with_fragment_versions(events_page.object_list)
 
     context = {
-        'total_participants': total_participants,
-        'total_events': total_events,
-        'total_upcoming_events': total_upcoming_events,
-        'total_past_events': total_past_events,
+        **stats,
         'events': events,
-        'filtered_events': filtered_events,
+        'filtered_events': events_page,
+        'page': events_page,
         'categories': categories,
         'start_date': start_date,
         'end_date': end_date,
         'filter_title': filter_title,
         # 'today_events': today_events,
-        "users": users,
     }
 
     return render(request, 'admin/admin_dashboard.html', context)
@@ -170,9 +162,9 @@ def redirect_dashboard(request):
 
     if request.user.is_superuser:
         return redirect('admin-dashboard')
-    elif request.user.groups.filter(name='Organizer').exists():
+    elif has_role(request.user, 'Organizer'):
         return redirect('organizer-dashboard')
-    elif request.user.groups.filter(name='Participant').exists():
+    elif has_role(request.user, 'Participant'):
         return redirect('participant-dashboard')
     else:
         return redirect('no-permission')
@@ -218,8 +210,19 @@ def group_list(request):
 @user_passes_test(is_admin, login_url='no-permission')
 @login_required
 def user_list(request):
-    users = User.objects.all().order_by('-date_joined')
-    return render(request, 'admin/user_list.html', {'users': users})
+    query = request.GET.get('q', '').strip()
+    users = paginate(request, admin_user_rows(query), USER_ORDERING, per_page=USERS_PER_PAGE)
+    return render(request, 'admin/user_list.html', {'users': users, 'page': users, 'query': query})
+
+
+# The admin dashboard's user table, fetched by the page only when it is opened or searched.
+@user_passes_test(is_admin, login_url='no-permission')
+@login_required
+@read_from_replica
+def user_table(request):
+    query = request.GET.get('q', '').strip()
+    users = paginate(request, admin_user_rows(query), USER_ORDERING, per_page=USERS_PER_PAGE)
+    return render(request, 'admin/user_table.html', {'users': users, 'page': users, 'query': query})
 
 
 @user_passes_test(is_admin, login_url='no-permission')
@@ -228,8 +231,10 @@ def remove_participant(request, user_id):
     participant_group = Group.objects.filter(name="Participant").first()
 
     if participant_group and participant_group in user.groups.all():
-        user.groups.remove(participant_group)
-        user.rsvp_events.clear()
+        with transaction.atomic():
+            user.groups.remove(participant_group)
+            user.rsvp_events.clear()
+        pin_after_write(request)
         messages.success(request, f"{user.username} removed from Participants.")
     else:
         messages.error(request, "User is not a participant.")